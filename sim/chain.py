@@ -14,11 +14,15 @@ Important:
 """
 
 import json
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Optional
 
+import requests
+from requests.adapters import HTTPAdapter
 from eth_account import Account
+from eth_account.signers.local import LocalAccount
 from web3 import Web3
 from web3.contract import Contract
 
@@ -39,6 +43,40 @@ HARDHAT_DEFAULT_PRIVKEY0 = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae
 MIN_SQRT_RATIO = 4295128739
 MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
 
+# Canonical Multicall3 deployment (same address on mainnet, Sepolia and most forks).
+# Plain local Hardhat/Anvil nodes do not have it unless forked or deployed manually.
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    }
+]
+
 
 @dataclass
 class Agent:
@@ -47,6 +85,8 @@ class Agent:
     private_key: str
     executor: Optional[str] = None
     agent_type: str = "retail"
+    # Signing account derived from private_key on first use (see Chain.agent_account).
+    signer: Optional[LocalAccount] = field(default=None, repr=False, compare=False)
 
 
 def to_wei_amount(amount: float, decimals: int = 18) -> int:
@@ -57,7 +97,14 @@ def to_wei_amount(amount: float, decimals: int = 18) -> int:
 class Chain:
     def __init__(self, rpc_url: str, token: str, pool: str, weth: str, *, fast_mode: bool = False):
         # Forked or busy nodes can be slow; use a moderate timeout.
-        self.w3 = Web3(Web3.HTTPProvider(rpc_url, request_kwargs={"timeout": 20}))
+        # A shared session keeps HTTP connections alive across calls and threads.
+        # requests pools only 10 connections per host by default, fewer than the
+        # receipt/init worker pools, so size it to avoid reconnecting under load.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.w3 = Web3(Web3.HTTPProvider(rpc_url, request_kwargs={"timeout": 20}, session=self.session))
         if not self.w3.is_connected():
             raise RuntimeError(f"Could not connect to RPC: {rpc_url}")
 
@@ -86,8 +133,13 @@ class Chain:
 
         # Per-signer nonce cache to avoid "nonce too low" with rapid sends.
         self._nonce_cache: dict[str, int] = {}
+        # Chain ID never changes for a connection; read it once on first use.
+        self._chain_id: Optional[int] = None
         # Allowance cache: (owner, token, spender) -> allowance
         self._allowance_cache: dict[tuple[str, str, str], int] = {}
+        # Multicall3 availability is probed lazily (None = not checked yet).
+        self._multicall: Optional[Contract] = None
+        self._multicall_checked = False
 
         # Load PoolSwapExecutor bytecode for deployment
         exec_artifact_path = executor_artifact_path()
@@ -106,42 +158,20 @@ class Chain:
         and reject unknown fields like gasPrice (your current error).
         """
         # Nonce + chain ID (always refresh from pending, override any prefilled nonce)
-        from_addr = from_acct.address
-        pending = self.w3.eth.get_transaction_count(from_addr, "pending")
-        cached = self._nonce_cache.get(from_addr)
-        if cached is None or cached < pending:
-            cached = pending
-        tx["nonce"] = cached
-        self._nonce_cache[from_addr] = cached + 1
-        tx.setdefault("chainId", self.w3.eth.chain_id)
-
-        # Fee fields (EIP-1559)
-        # Use the node's suggested max priority fee if available; otherwise fall back.
-        try:
-            priority = self.w3.eth.max_priority_fee  # supported on many clients
-        except Exception:
-            priority = self.w3.to_wei(1, "gwei")     # safe fallback for local
-
-        # baseFeePerGas is present in latest blocks on EIP-1559 networks (Hardhat supports this).
-        latest_block = self.w3.eth.get_block("latest")
-        base_fee = latest_block.get("baseFeePerGas")
-
-        if base_fee is None:
-            # If the chain is not reporting baseFeePerGas, fall back to legacy gasPrice safely.
-            # In this case, we must NOT include EIP-1559 fields.
-            tx.setdefault("gasPrice", self.w3.eth.gas_price)
+        tx["nonce"] = self._reserve_nonces(from_acct.address, 1)
+        tx.setdefault("chainId", self.chain_id())
+
+        # build_transaction() already filled EIP-1559 fees; only look them up when missing.
+        if "maxFeePerGas" not in tx or "maxPriorityFeePerGas" not in tx:
+            fees = self._fee_fields()
+            for key, value in fees.items():
+                tx.setdefault(key, value)
+            if "gasPrice" not in fees:
+                # Ensure we do not accidentally carry a gasPrice field.
+                tx.pop("gasPrice", None)
         else:
-            # Standard approach: maxFee = 2*baseFee + priority
-            max_fee = int(base_fee * 2 + priority)
-            tx.setdefault("maxPriorityFeePerGas", int(priority))
-            tx.setdefault("maxFeePerGas", int(max_fee))
-
-            # Explicitly set type=2 to ensure typed tx encoding.
             tx.setdefault("type", 2)
 
-            # Ensure we do not accidentally carry a gasPrice field.
-            tx.pop("gasPrice", None)
-
         # Gas estimation (do this after fee fields are present)
         if "gas" not in tx:
             if self.fast_mode:
@@ -149,7 +179,10 @@ class Chain:
             else:
                 tx["gas"] = self.w3.eth.estimate_gas(tx)
 
-        # Sign and send
+        return self._sign_and_send(from_acct, tx)
+
+    def _sign_and_send(self, from_acct: Account, tx: dict[str, Any]) -> str:
+        """Sign a fully populated transaction and broadcast it."""
         signed = from_acct.sign_transaction(tx)
 
         # web3.py / eth-account compatibility: handle rawTransaction vs raw_transaction
@@ -158,6 +191,59 @@ class Chain:
 
         return tx_hash.hex()
 
+    @staticmethod
+    def agent_account(agent: Agent) -> LocalAccount:
+        """Signing account for an agent; the key is parsed once and kept on the Agent."""
+        if agent.signer is None:
+            agent.signer = Account.from_key(agent.private_key)
+        return agent.signer
+
+    def chain_id(self) -> int:
+        """Chain ID of the connected node (cached after the first call)."""
+        if self._chain_id is None:
+            self._chain_id = int(self.w3.eth.chain_id)
+        return self._chain_id
+
+    def _reserve_nonces(self, from_addr: str, count: int) -> int:
+        """
+        Reserve `count` consecutive nonces for from_addr and return the first.
+        The pending count is re-read every time so external sends are never reused.
+        """
+        pending = self.w3.eth.get_transaction_count(from_addr, "pending")
+        cached = self._nonce_cache.get(from_addr)
+        if cached is None or cached < pending:
+            cached = pending
+        self._nonce_cache[from_addr] = cached + count
+        return cached
+
+    def _fee_fields(self) -> dict[str, int]:
+        """
+        Fee fields for a new transaction.
+
+        Important:
+        - EIP-1559 (maxFeePerGas, maxPriorityFeePerGas, type=2) when the chain reports
+          baseFeePerGas; otherwise legacy gasPrice only, and never both.
+        """
+        # Use the node's suggested max priority fee if available; otherwise fall back.
+        try:
+            priority = self.w3.eth.max_priority_fee  # supported on many clients
+        except Exception:
+            priority = self.w3.to_wei(1, "gwei")     # safe fallback for local
+
+        # baseFeePerGas is present in latest blocks on EIP-1559 networks (Hardhat supports this).
+        latest_block = self.w3.eth.get_block("latest")
+        base_fee = latest_block.get("baseFeePerGas")
+
+        if base_fee is None:
+            # If the chain is not reporting baseFeePerGas, fall back to legacy gasPrice safely.
+            return {"gasPrice": self.w3.eth.gas_price}
+        # Standard approach: maxFee = 2*baseFee + priority; type=2 for typed tx encoding.
+        return {
+            "maxPriorityFeePerGas": int(priority),
+            "maxFeePerGas": int(base_fee * 2 + priority),
+            "type": 2,
+        }
+
 
     def wait_receipt(self, tx_hash: str, timeout_s: int = 20, retries: int = 2) -> Any:
         """Wait for a transaction receipt with retry on timeout."""
@@ -170,6 +256,74 @@ class Chain:
         if last_err:
             raise last_err
 
+    # ----------------------------
+    # Batched reads
+    # ----------------------------
+
+    def multicall_available(self) -> bool:
+        """Return True if Multicall3 is deployed on the connected chain."""
+        if not self._multicall_checked:
+            self._multicall_checked = True
+            addr = Web3.to_checksum_address(MULTICALL3_ADDRESS)
+            try:
+                code = self.w3.eth.get_code(addr)
+            except Exception:
+                code = b""
+            if code:
+                self._multicall = self.w3.eth.contract(address=addr, abi=MULTICALL3_ABI)
+        return self._multicall is not None
+
+    def multicall(self, calls: list[tuple[str, bytes]], block_identifier: Any = "latest") -> list[Optional[bytes]]:
+        """
+        Execute many read-only calls in a single eth_call via Multicall3.aggregate3.
+
+        calls: [(target_address, calldata), ...]
+        Returns one entry per call: the raw return bytes, or None if that call failed.
+        Callers must check multicall_available() first.
+        """
+        if not self.multicall_available():
+            raise RuntimeError(f"Multicall3 not deployed at {MULTICALL3_ADDRESS}")
+        if not calls:
+            return []
+        payload = [(Web3.to_checksum_address(target), True, data) for target, data in calls]
+        results = self._multicall.functions.aggregate3(payload).call(block_identifier=block_identifier)
+        return [bytes(ret) if ok else None for ok, ret in results]
+
+    def get_logs_chunked(
+        self,
+        event: Any,
+        from_block: int,
+        to_block: int,
+        *,
+        chunk_blocks: int = 2000,
+        max_workers: int = 16,
+    ) -> list[Any]:
+        """
+        Fetch event logs over [from_block, to_block] in fixed-size block chunks.
+
+        Chunks are fetched concurrently (RPC-latency bound) and the merged result is
+        returned in chain order (blockNumber, logIndex). Large single-range requests
+        are often rejected by providers, so this is also the safe default.
+        """
+        if to_block < from_block:
+            return []
+        step = max(1, int(chunk_blocks))
+        ranges = [(lo, min(lo + step - 1, to_block)) for lo in range(from_block, to_block + 1, step)]
+
+        def fetch(bounds: tuple[int, int]) -> list[Any]:
+            lo, hi = bounds
+            # The pinned web3.py 6.x takes fromBlock/toBlock here; the snake_case
+            # from_block/to_block kwargs only arrived in v7. Keep camelCase.
+            return list(event.get_logs(fromBlock=lo, toBlock=hi))
+
+        if len(ranges) == 1:
+            logs = fetch(ranges[0])
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(ranges))) as pool:
+                logs = [ev for chunk in pool.map(fetch, ranges) for ev in chunk]
+        logs.sort(key=lambda ev: (int(ev["blockNumber"]), int(ev["logIndex"])))
+        return logs
+
     # ----------------------------
     # Funding / seeding helpers
     # ----------------------------
@@ -183,6 +337,45 @@ class Chain:
         }
         return self._build_and_send(self.admin, tx)
 
+    def fund_agents(self, addresses: list[str], eth_amount: float, token_amount: float) -> list[str]:
+        """
+        Send ETH and seed TOKEN from the admin to many agents.
+
+        The lookups _build_and_send makes per tx (pending nonce, chain id, fee fields,
+        gas estimate) are made once for the whole batch: nonces are reserved as one
+        consecutive block and TOKEN transfer gas is estimated on the first recipient
+        (every recipient is a fresh wallet, so the cost is the same). Each tx then
+        costs a single eth_sendRawTransaction.
+
+        Returns two tx hashes per address, ETH funding first. If a send raises, the
+        admin nonce cache is dropped so the next send re-syncs from the pending count
+        instead of leaving the rest of the reserved block as a nonce gap.
+        """
+        if not addresses:
+            return []
+        admin_addr = self.admin.address
+        nonce = self._reserve_nonces(admin_addr, 2 * len(addresses))
+        common = {"from": admin_addr, "chainId": self.chain_id(), **self._fee_fields()}
+        value_wei = self.w3.to_wei(eth_amount, "ether")
+        token_wei = to_wei_amount(token_amount, 18)
+        token_gas: Optional[int] = None
+        hashes: list[str] = []
+        try:
+            for addr in addresses:
+                to_addr = Web3.to_checksum_address(addr)
+                transfer = self.token.functions.transfer(to_addr, token_wei)
+                if token_gas is None:
+                    token_gas = self.default_gas if self.fast_mode else int(transfer.estimate_gas({"from": admin_addr}))
+                eth_tx = {**common, "to": to_addr, "value": value_wei, "gas": 21000, "nonce": nonce}
+                token_tx = transfer.build_transaction({**common, "gas": token_gas, "nonce": nonce + 1})
+                hashes.append(self._sign_and_send(self.admin, eth_tx))
+                hashes.append(self._sign_and_send(self.admin, token_tx))
+                nonce += 2
+        except Exception:
+            self._nonce_cache.pop(admin_addr, None)
+            raise
+        return hashes
+
     def wrap_eth_to_weth(self, acct: Account, eth_amount: float) -> str:
         """Wrap ETH into WETH by calling WETH.deposit()."""
         fn = self.weth.functions.deposit()
@@ -204,7 +397,7 @@ class Chain:
         Transfer ERC20 from an agent wallet to another address.
         Useful for simple churn/exit handling without market impact.
         """
-        acct = Account.from_key(agent.private_key)
+        acct = self.agent_account(agent)
         token = self.w3.eth.contract(address=Web3.to_checksum_address(token_addr), abi=self.erc20_abi)
         fn = token.functions.transfer(Web3.to_checksum_address(to_addr), int(amount_wei))
         tx = fn.build_transaction({"from": acct.address})
@@ -238,7 +431,7 @@ class Chain:
 
     def preapprove_agent(self, agent: Agent, executor_addr: str) -> None:
         """Pre-approve large allowances to avoid per-trade approvals in fast mode."""
-        acct = Account.from_key(agent.private_key)
+        acct = self.agent_account(agent)
         self.ensure_approval(acct, self.weth, executor_addr, to_wei_amount(10_000, 18))
         self.ensure_approval(acct, self.token, executor_addr, to_wei_amount(10_000_000, 18))
 
@@ -253,7 +446,7 @@ class Chain:
         ABI-confirmed constructor:
           constructor(address _pool, address _payer)
         """
-        agent_acct = Account.from_key(agent.private_key)
+        agent_acct = self.agent_account(agent)
         factory = self.w3.eth.contract(abi=self.exec_abi, bytecode=self.exec_bytecode)
 
         tx = factory.constructor(self.pool_addr, agent_acct.address).build_transaction({"from": agent_acct.address})
@@ -324,7 +517,7 @@ class Chain:
         Conventions:
           amountSpecified > 0 means exact input.
         """
-        acct = Account.from_key(agent.private_key)
+        acct = self.agent_account(agent)
         executor = self.get_executor(executor_addr)
 
         zero_for_one = self.compute_zero_for_one(token_in_addr, pool_token0, pool_token1)
@@ -345,6 +538,6 @@ class Chain:
             int(amount_in_wei),   # int256
             int(sqrt_limit)       # uint160
         )
-        tx = fn.build_transaction({"from": acct.address, "gas": 250000})
+        tx = fn.build_transaction({"from": acct.address, "gas": 250000, "chainId": self.chain_id()})
         tx_hash = self._build_and_send(acct, tx)
         return tx_hash
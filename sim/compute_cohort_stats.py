@@ -83,21 +83,80 @@ def _get_max_day(conn: sqlite3.Connection, run_id: str) -> int:
     return int(row[0] or 0)
 
 
-def _cohort_counts(conn: sqlite3.Connection, run_id: str) -> tuple[int, int, dict[str, int]]:
-    eligible = conn.execute(
-        "SELECT COUNT(*) FROM wallet_cohorts WHERE run_id=? AND eligible=1",
-        (run_id,),
-    ).fetchone()[0]
-    control = conn.execute(
-        "SELECT COUNT(*) FROM wallet_cohorts WHERE run_id=? AND eligible=0",
+def _cohort_counts(conn: sqlite3.Connection, run_id: str) -> tuple[int, int]:
+    row = conn.execute(
+        "SELECT COALESCE(SUM(eligible = 1), 0), COALESCE(SUM(eligible = 0), 0) FROM wallet_cohorts WHERE run_id=?",
         (run_id,),
-    ).fetchone()[0]
+    ).fetchone()
+    return int(row[0]), int(row[1])
+
+
+def _minted_by_day(
+    conn: sqlite3.Connection, run_id: str, day0_block: int, blocks_per_day: int, last_day: int
+) -> dict[int, tuple[int, int]]:
+    """
+    Count mints per day split by cohort in one grouped pass over nft_mints.
+
+    Day is clamped to [0, last_day]; recipients without a wallet_cohorts row count as control.
+    Returns {day: (minted_eligible, minted_control)}.
+    """
+    if not conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='nft_mints'").fetchone():
+        return {}
     rows = conn.execute(
-        "SELECT address, eligible FROM wallet_cohorts WHERE run_id=?",
-        (run_id,),
+        """
+        SELECT
+          MAX(0, MIN(CASE WHEN :bpd > 0 THEN (m.block_number - :d0) / :bpd ELSE 0 END, :last)) AS day,
+          SUM(COALESCE(c.eligible, 0) != 0),
+          SUM(COALESCE(c.eligible, 0) = 0)
+        FROM nft_mints m
+        LEFT JOIN wallet_cohorts c ON c.run_id = :run_id AND c.address = LOWER(m.to_address)
+        GROUP BY day
+        """,
+        {"bpd": int(blocks_per_day), "d0": int(day0_block), "last": int(last_day), "run_id": run_id},
     ).fetchall()
-    elig_map = {str(addr).lower(): int(el) for addr, el in rows}
-    return int(eligible), int(control), elig_map
+    return {int(day): (int(el), int(ctl)) for day, el, ctl in rows}
+
+
+def run(conn: sqlite3.Connection, run_id: Optional[str] = None) -> str:
+    """Write cohort_daily_stats for run_id (default: latest) on an open connection; returns run_id."""
+    _ensure_tables(conn)
+    run_id = run_id or _get_latest_run_id(conn)
+    day0_block, blocks_per_day = _get_run_stats(conn, run_id)
+    last_day = _get_max_day(conn, run_id)
+
+    eligible_wallets, control_wallets = _cohort_counts(conn, run_id)
+    minted_by_day = _minted_by_day(conn, run_id, day0_block, blocks_per_day, last_day)
+
+    rows = []
+    for day in range(last_day + 1):
+        minted_eligible, minted_control = minted_by_day.get(day, (0, 0))
+        rows.append(
+            (
+                run_id,
+                day,
+                eligible_wallets,
+                control_wallets,
+                minted_eligible,
+                minted_control,
+                minted_eligible + minted_control,
+            )
+        )
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO cohort_daily_stats(
+          run_id, day, eligible_wallets, control_wallets, minted_eligible, minted_control, minted_total
+        )
+        VALUES (?,?,?,?,?,?,?)
+        """,
+        rows,
+    )
+
+    conn.commit()
+    print(
+        f"Wrote cohort_daily_stats rows for run_id={run_id} days=0..{last_day} "
+        f"(eligible={eligible_wallets} control={control_wallets})."
+    )
+    return run_id
 
 
 def main() -> None:
@@ -109,56 +168,7 @@ def main() -> None:
     db_path = Path(args.db_path)
     conn = sqlite3.connect(str(db_path))
     try:
-        _ensure_tables(conn)
-        run_id = args.run_id or _get_latest_run_id(conn)
-        day0_block, blocks_per_day = _get_run_stats(conn, run_id)
-        last_day = _get_max_day(conn, run_id)
-
-        eligible_wallets, control_wallets, elig_map = _cohort_counts(conn, run_id)
-
-        minted_by_day = {}
-        if conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='nft_mints'").fetchone():
-            rows = conn.execute(
-                "SELECT to_address, block_number FROM nft_mints ORDER BY block_number ASC"
-            ).fetchall()
-            for to_addr, block_num in rows:
-                day = int((int(block_num) - day0_block) // blocks_per_day) if blocks_per_day > 0 else 0
-                day = max(0, min(day, last_day))
-                bucket = minted_by_day.setdefault(day, {"eligible": 0, "control": 0})
-                is_eligible = elig_map.get(str(to_addr).lower(), 0)
-                if is_eligible:
-                    bucket["eligible"] += 1
-                else:
-                    bucket["control"] += 1
-
-        for day in range(last_day + 1):
-            bucket = minted_by_day.get(day, {"eligible": 0, "control": 0})
-            minted_eligible = int(bucket["eligible"])
-            minted_control = int(bucket["control"])
-            minted_total = minted_eligible + minted_control
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO cohort_daily_stats(
-                  run_id, day, eligible_wallets, control_wallets, minted_eligible, minted_control, minted_total
-                )
-                VALUES (?,?,?,?,?,?,?)
-                """,
-                (
-                    run_id,
-                    day,
-                    eligible_wallets,
-                    control_wallets,
-                    minted_eligible,
-                    minted_control,
-                    minted_total,
-                ),
-            )
-
-        conn.commit()
-        print(
-            f"Wrote cohort_daily_stats rows for run_id={run_id} days=0..{last_day} "
-            f"(eligible={eligible_wallets} control={control_wallets})."
-        )
+        run(conn, args.run_id)
     finally:
         conn.close()
 
@@ -19,6 +19,7 @@ import argparse
 import os
 import sqlite3
 from pathlib import Path
+from typing import Optional
 
 from dotenv import load_dotenv
 
@@ -169,16 +170,12 @@ def get_wallets_for_run(conn: sqlite3.Connection, run_id: str) -> list[str]:
     return [str(r[0]).lower() for r in rows]
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("db_path", help="Path to sim.db")
-    parser.add_argument("--run-id", dest="run_id", default=None)
-    args = parser.parse_args()
-
-    db_path = Path(args.db_path)
-    if not db_path.exists():
-        raise SystemExit(f"DB not found: {db_path}")
+def run(conn: sqlite3.Connection, run_id: Optional[str] = None) -> str:
+    """
+    Write wallet_cohorts for run_id (default: latest run) on an open connection.
 
+    Returns the resolved run_id.
+    """
     # Load .env reliably
     load_env_explicit()
 
@@ -186,38 +183,54 @@ def main() -> None:
     pct = _env_int("COHORT_ELIGIBLE_PERCENT", 50)
     salt = (os.getenv("COHORT_SALT") or "").strip()
 
-    conn = sqlite3.connect(str(db_path))
     ensure_tables(conn)
 
-    run_id = args.run_id or get_latest_run_id(conn)
+    run_id = run_id or get_latest_run_id(conn)
 
     # Prefer run_wallets; if missing/empty, backfill from agents
     wallets = get_wallets_for_run(conn, run_id)
 
     if not wallets:
-        conn.close()
         raise RuntimeError(f"No wallets found for run_id={run_id} (agents/run_wallets empty).")
 
     # Write cohorts deterministically
-    written = 0
+    rows = []
     for addr_l in wallets:
         elig, bucket = is_eligible(addr_l, enabled, pct, salt)
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO wallet_cohorts(run_id, address, bucket, eligible)
-            VALUES (?,?,?,?)
-            """,
-            (run_id, addr_l, int(bucket), int(elig)),
-        )
-        written += 1
+        rows.append((run_id, addr_l, int(bucket), int(elig)))
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO wallet_cohorts(run_id, address, bucket, eligible)
+        VALUES (?,?,?,?)
+        """,
+        rows,
+    )
+    written = len(rows)
 
     conn.commit()
-    conn.close()
 
     print(
         f"Wrote {written} wallet_cohorts rows for run_id={run_id} "
         f"(enabled={enabled} pct={pct})."
     )
+    return run_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("db_path", help="Path to sim.db")
+    parser.add_argument("--run-id", dest="run_id", default=None)
+    args = parser.parse_args()
+
+    db_path = Path(args.db_path)
+    if not db_path.exists():
+        raise SystemExit(f"DB not found: {db_path}")
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        run(conn, args.run_id)
+    finally:
+        conn.close()
 
 
 if __name__ == "__main__":
@@ -24,8 +24,11 @@ import sqlite3
 import sys
 from typing import Optional
 
-from sim.config import load_config
-from sim.price import sqrt_price_x96_to_price_token1_per_token0
+from sim.config import SimConfig, load_config
+from sim.price import sqrt_price_x96_to_price_token1_per_token0, sqrt_prices_x96_to_prices_token1_per_token0
+
+
+_RUN_STAT_UPSERT_SQL = "INSERT OR REPLACE INTO run_stats(key, value) VALUES (?,?)"
 
 
 def ensure_tables(conn: sqlite3.Connection) -> None:
@@ -48,6 +51,7 @@ def ensure_tables(conn: sqlite3.Connection) -> None:
           normalized_price REAL NOT NULL,
           PRIMARY KEY (tx_hash, log_index)
         );
+        CREATE INDEX IF NOT EXISTS swap_prices_block ON swap_prices(block_number, tx_hash, log_index);
 
         CREATE TABLE IF NOT EXISTS daily_prices (
           day INTEGER PRIMARY KEY,
@@ -76,6 +80,15 @@ def ensure_tables(conn: sqlite3.Connection) -> None:
     conn.commit()
 
 
+def _token_is_0(cfg) -> bool:
+    """True if TOKEN is pool token0, False if token1; raises if it is neither."""
+    if cfg.token.lower() == cfg.pool_token0.lower():
+        return True
+    if cfg.token.lower() == cfg.pool_token1.lower():
+        return False
+    raise ValueError("Config TOKEN is not pool token0/token1; cannot compute price.")
+
+
 def price_weth_per_token_from_sqrt(cfg, sqrt_price_x96: int) -> float:
     """
     Convert sqrtPriceX96 to WETH/TOKEN using pool token ordering.
@@ -84,17 +97,17 @@ def price_weth_per_token_from_sqrt(cfg, sqrt_price_x96: int) -> float:
     We then map that to WETH/TOKEN depending on where TOKEN sits.
     """
     p_token1_per_token0 = sqrt_price_x96_to_price_token1_per_token0(sqrt_price_x96)
-
-    token_is_0 = cfg.token.lower() == cfg.pool_token0.lower()
-    token_is_1 = cfg.token.lower() == cfg.pool_token1.lower()
-
-    if token_is_0:
+    if _token_is_0(cfg):
         return float(p_token1_per_token0)
+    return float(1.0 / p_token1_per_token0) if p_token1_per_token0 != 0 else 0.0
 
-    if token_is_1:
-        return float(1.0 / p_token1_per_token0) if p_token1_per_token0 != 0 else 0.0
 
-    raise ValueError("Config TOKEN is not pool token0/token1; cannot compute price.")
+def prices_weth_per_token_from_sqrt(cfg, sqrt_prices_x96: list[int]) -> list[float]:
+    """Bulk price_weth_per_token_from_sqrt: resolves token ordering once for the whole column."""
+    prices = sqrt_prices_x96_to_prices_token1_per_token0(sqrt_prices_x96)
+    if _token_is_0(cfg):
+        return prices
+    return [1.0 / p if p != 0 else 0.0 for p in prices]
 
 
 def get_run_stat(conn: sqlite3.Connection, key: str) -> Optional[str]:
@@ -105,7 +118,12 @@ def get_run_stat(conn: sqlite3.Connection, key: str) -> Optional[str]:
 
 def set_run_stat(conn: sqlite3.Connection, key: str, value: str) -> None:
     """Upsert a run_stats key/value."""
-    conn.execute("INSERT OR REPLACE INTO run_stats(key, value) VALUES (?,?)", (key, value))
+    conn.execute(_RUN_STAT_UPSERT_SQL, (key, value))
+
+
+def set_run_stats(conn: sqlite3.Connection, pairs: list[tuple[str, str]]) -> None:
+    """Upsert several run_stats key/values in one executemany."""
+    conn.executemany(_RUN_STAT_UPSERT_SQL, pairs)
 
 
 def median(xs: list[float]) -> float:
@@ -118,14 +136,8 @@ def median(xs: list[float]) -> float:
     return 0.5 * (xs_sorted[mid - 1] + xs_sorted[mid])
 
 
-def main() -> None:
-    if len(sys.argv) != 2:
-        raise SystemExit("Usage: python -m sim.compute_prices <path/to/sim.db>")
-
-    db_path = sys.argv[1]
-    cfg = load_config()
-
-    conn = sqlite3.connect(db_path)
+def run(conn: sqlite3.Connection, cfg: SimConfig) -> None:
+    """Compute swap_prices + daily_prices from swaps on an open connection."""
     ensure_tables(conn)
 
     swaps = conn.execute(
@@ -171,16 +183,18 @@ def main() -> None:
     all_rows: list[tuple[int, str, int, str, int, float, int]] = []
     prices_by_day: dict[int, list[float]] = {}
 
-    for block_number, tx_hash, log_index, sqrt_price_x96_s, tick in swaps:
+    sqrt_prices = [int(row[3]) for row in swaps]
+    prices = prices_weth_per_token_from_sqrt(cfg, sqrt_prices)
+
+    for (block_number, tx_hash, log_index, _sqrt_s, tick), sqrt_price_x96, p in zip(swaps, sqrt_prices, prices):
         b = int(block_number)
-        p = float(price_weth_per_token_from_sqrt(cfg, int(sqrt_price_x96_s)))
         txh_norm = str(tx_hash).lower()
         if txh_norm in mined_day_by_tx:
             day = int(mined_day_by_tx[txh_norm])
         else:
             day = (b - day0_block) // blocks_per_day
 
-        all_rows.append((b, tx_hash, int(log_index), str(int(sqrt_price_x96_s)), int(tick), p, int(day)))
+        all_rows.append((b, tx_hash, int(log_index), str(sqrt_price_x96), int(tick), p, int(day)))
 
         prices_by_day.setdefault(int(day), []).append(p)
 
@@ -193,11 +207,16 @@ def main() -> None:
         anchor_day = 0
         anchor_prices = prices_by_day.get(anchor_day, [])
         # Persist anchor metadata
-        set_run_stat(conn, "anchor_policy", anchor_policy)
-        set_run_stat(conn, "anchor_day", str(anchor_day))
-        set_run_stat(conn, "anchor_price_weth_per_token", str(anchor_price))
-        set_run_stat(conn, "anchor_day_swap_count", str(len(anchor_prices)))
-        set_run_stat(conn, "blocks_per_day", str(blocks_per_day))
+        set_run_stats(
+            conn,
+            [
+                ("anchor_policy", anchor_policy),
+                ("anchor_day", str(anchor_day)),
+                ("anchor_price_weth_per_token", str(anchor_price)),
+                ("anchor_day_swap_count", str(len(anchor_prices))),
+                ("blocks_per_day", str(blocks_per_day)),
+            ],
+        )
     else:
         anchor_policy = "FIRST_NONEMPTY_DAY_MEDIAN"
         # Choose the first day that actually has swaps
@@ -215,35 +234,34 @@ def main() -> None:
             raise SystemExit(f"Anchor price computed as <= 0 ({anchor_price}). Check pool/token mapping.")
 
         # Persist anchor metadata
-        set_run_stat(conn, "anchor_policy", anchor_policy)
-        set_run_stat(conn, "anchor_day", str(anchor_day))
-        set_run_stat(conn, "anchor_price_weth_per_token", str(anchor_price))
-        set_run_stat(conn, "anchor_day_swap_count", str(len(anchor_prices)))
-        set_run_stat(conn, "blocks_per_day", str(blocks_per_day))
+        set_run_stats(
+            conn,
+            [
+                ("anchor_policy", anchor_policy),
+                ("anchor_day", str(anchor_day)),
+                ("anchor_price_weth_per_token", str(anchor_price)),
+                ("anchor_day_swap_count", str(len(anchor_prices))),
+                ("blocks_per_day", str(blocks_per_day)),
+            ],
+        )
     conn.commit()
 
     # --- Pass 2: write swap_prices using the computed anchor ---
-    inserted = 0
-    for b, tx_hash, log_index, sqrt_s, tick, price_weth_per_token, _day in all_rows:
-        normalized = float(price_weth_per_token) / float(anchor_price)
-
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO swap_prices
-              (tx_hash, log_index, block_number, sqrt_price_x96, tick, price_weth_per_token, normalized_price)
-            VALUES (?,?,?,?,?,?,?)
-            """,
-            (
-                tx_hash,
-                int(log_index),
-                int(b),
-                sqrt_s,
-                int(tick),
-                float(price_weth_per_token),
-                float(normalized),
-            ),
-        )
-        inserted += 1
+    # One reciprocal per run; each row is then a multiply instead of a divide.
+    inv_anchor = 1.0 / float(anchor_price)
+    swap_price_rows = [
+        (tx_hash, log_index, b, sqrt_s, tick, p, p * inv_anchor)
+        for b, tx_hash, log_index, sqrt_s, tick, p, _day in all_rows
+    ]
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO swap_prices
+          (tx_hash, log_index, block_number, sqrt_price_x96, tick, price_weth_per_token, normalized_price)
+        VALUES (?,?,?,?,?,?,?)
+        """,
+        swap_price_rows,
+    )
+    inserted = len(swap_price_rows)
 
     conn.commit()
 
@@ -255,16 +273,10 @@ def main() -> None:
     print(f"Day bucketing uses day0_block={day0_block} (run_stats.day0_block).")
 
     # --- Daily aggregation ---
+    # Uses the (price, normalized) pairs just written rather than re-reading swap_prices per row.
     daily: dict[int, dict[str, float]] = {}
-    for b, tx_hash, log_index, _sqrt, _tick, _p, day in all_rows:
-        r = conn.execute(
-            "SELECT price_weth_per_token, normalized_price FROM swap_prices WHERE tx_hash=? AND log_index=?",
-            (tx_hash, int(log_index)),
-        ).fetchone()
-        if r is None:
-            continue
-
-        p, n = float(r[0]), float(r[1])
+    for (_b, _tx, _li, _sqrt, _tick, _p, day), row in zip(all_rows, swap_price_rows):
+        p, n = row[5], row[6]
 
         if day not in daily:
             daily[day] = {
@@ -353,10 +365,23 @@ def main() -> None:
         )
 
     conn.commit()
-    conn.close()
 
     print(f"Wrote {len(daily)} daily_prices rows.")
 
 
+def main() -> None:
+    if len(sys.argv) != 2:
+        raise SystemExit("Usage: python -m sim.compute_prices <path/to/sim.db>")
+
+    db_path = sys.argv[1]
+    cfg = load_config()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        run(conn, cfg)
+    finally:
+        conn.close()
+
+
 if __name__ == "__main__":
     main()
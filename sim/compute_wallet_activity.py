@@ -38,12 +38,8 @@ def ensure(conn: sqlite3.Connection) -> None:
     conn.commit()
 
 
-def main() -> None:
-    if len(sys.argv) != 2:
-        raise SystemExit("Usage: python -m sim.compute_wallet_activity <path/to/sim.db>")
-
-    db_path = sys.argv[1]
-    conn = sqlite3.connect(db_path)
+def run(conn: sqlite3.Connection) -> int:
+    """Rebuild wallet_activity from swaps on an open connection; returns rows written."""
     ensure(conn)
 
     # Load day0_block
@@ -123,8 +119,20 @@ def main() -> None:
         )
 
     conn.commit()
-    conn.close()
     print(f"Wrote {len(agg)} wallet_activity rows.")
+    return len(agg)
+
+
+def main() -> None:
+    if len(sys.argv) != 2:
+        raise SystemExit("Usage: python -m sim.compute_wallet_activity <path/to/sim.db>")
+
+    db_path = sys.argv[1]
+    conn = sqlite3.connect(db_path)
+    try:
+        run(conn)
+    finally:
+        conn.close()
 
 
 if __name__ == "__main__":
@@ -17,8 +17,8 @@ from typing import Optional
 
 from web3 import Web3
 
-from sim.abi import load_artifact_abi, token_artifact_path
-from sim.config import load_config
+from sim.chain import Chain
+from sim.config import SimConfig, load_config
 
 
 def _ensure_tables(conn: sqlite3.Connection) -> None:
@@ -103,6 +103,80 @@ def _get_run_end_block(conn: sqlite3.Connection, run_id: str) -> "Optional[int]"
     return None
 
 
+def _balances_at(chain: Chain, token, wallets: list[str], block: int, batch_size: int = 400) -> list[int]:
+    """
+    balanceOf(wallet) at a historical block for every wallet.
+
+    One Multicall3 eth_call per batch when the node has it; a batch that fails
+    (e.g. Multicall3 not yet deployed at that block) or any failed sub-call falls
+    back to one eth_call per wallet.
+    """
+    balance_of = token.functions.balanceOf
+
+    def single(addr: str) -> int:
+        return int(balance_of(Web3.to_checksum_address(addr)).call(block_identifier=block))
+
+    if not chain.multicall_available():
+        return [single(addr) for addr in wallets]
+    selector = Web3.keccak(text="balanceOf(address)")[:4]
+    out: list[int] = []
+    for i in range(0, len(wallets), batch_size):
+        batch = wallets[i:i + batch_size]
+        calls = [(token.address, selector + bytes(12) + bytes.fromhex(Web3.to_checksum_address(a)[2:])) for a in batch]
+        try:
+            results = chain.multicall(calls, block_identifier=block)
+        except Exception:
+            results = [None] * len(batch)
+        out.extend(int.from_bytes(ret, "big") if ret else single(a) for a, ret in zip(batch, results))
+    return out
+
+
+def run(conn: sqlite3.Connection, cfg: SimConfig, run_id: Optional[str] = None) -> None:
+    """Write wallet_balances_daily for run_id (default: latest) on an open connection."""
+    run_id = run_id or _get_latest_run_id(conn)
+    _ensure_tables(conn)
+    wallet_day0_block = _get_wallet_day0_block(conn)
+    day0_block = wallet_day0_block if wallet_day0_block is not None else _get_day0_block(conn)
+    blocks_per_day = _get_blocks_per_day(conn)
+    max_day = _get_max_day(conn, run_id)
+    run_end_block = _get_run_end_block(conn, run_id)
+    wallets = [
+        r[0] for r in conn.execute(
+            "SELECT address FROM run_wallets WHERE run_id=? ORDER BY address ASC",
+            (run_id,),
+        ).fetchall()
+    ]
+
+    if not wallets:
+        print("No run_wallets found; skipping wallet balance extraction.")
+        return
+
+    chain = Chain(cfg.rpc_url, cfg.token, cfg.pool, cfg.weth)
+    token = chain.token
+
+    latest_block = int(chain.w3.eth.block_number)
+    max_block = latest_block
+    if run_end_block is not None:
+        max_block = min(max_block, int(run_end_block))
+
+    print(f"Computing wallet balances for run_id={run_id}, days=0..{max_day}")
+    for day in range(0, max_day + 1):
+        block = int(day0_block) + int(day) * int(blocks_per_day)
+        if block > max_block:
+            break
+        # Read the whole day before writing: post_run stages share sim.db, and the
+        # write transaction the INSERTs open must not stay open across RPCs.
+        balances = _balances_at(chain, token, wallets, block)
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO wallet_balances_daily(run_id, day, address, token_balance_raw)
+            VALUES (?,?,?,?)
+            """,
+            [(run_id, int(day), addr.lower(), str(int(bal))) for addr, bal in zip(wallets, balances)],
+        )
+        conn.commit()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("db_path", help="Path to sim.db")
@@ -116,58 +190,7 @@ def main() -> None:
     cfg = load_config()
     conn = sqlite3.connect(str(db_path))
     try:
-        run_id = args.run_id or _get_latest_run_id(conn)
-        _ensure_tables(conn)
-        wallet_day0_block = _get_wallet_day0_block(conn)
-        day0_block = wallet_day0_block if wallet_day0_block is not None else _get_day0_block(conn)
-        blocks_per_day = _get_blocks_per_day(conn)
-        max_day = _get_max_day(conn, run_id)
-        run_end_block = _get_run_end_block(conn, run_id)
-        wallets = [
-            r[0] for r in conn.execute(
-                "SELECT address FROM run_wallets WHERE run_id=? ORDER BY address ASC",
-                (run_id,),
-            ).fetchall()
-        ]
-    finally:
-        conn.close()
-
-    if not wallets:
-        print("No run_wallets found; skipping wallet balance extraction.")
-        return
-
-    w3 = Web3(Web3.HTTPProvider(cfg.rpc_url))
-    if not w3.is_connected():
-        raise RuntimeError(f"Could not connect to RPC: {cfg.rpc_url}")
-
-    token_abi = load_artifact_abi(token_artifact_path())
-    token = w3.eth.contract(address=Web3.to_checksum_address(cfg.token), abi=token_abi)
-
-    conn = sqlite3.connect(str(db_path))
-    try:
-        _ensure_tables(conn)
-        latest_block = int(w3.eth.block_number)
-        max_block = latest_block
-        if run_end_block is not None:
-            max_block = min(max_block, int(run_end_block))
-
-        print(f"Computing wallet balances for run_id={run_id}, days=0..{max_day}")
-        for day in range(0, max_day + 1):
-            block = int(day0_block) + int(day) * int(blocks_per_day)
-            if block > max_block:
-                break
-            for addr in wallets:
-                bal = token.functions.balanceOf(Web3.to_checksum_address(addr)).call(
-                    block_identifier=block
-                )
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO wallet_balances_daily(run_id, day, address, token_balance_raw)
-                    VALUES (?,?,?,?)
-                    """,
-                    (run_id, int(day), addr.lower(), str(int(bal))),
-                )
-            conn.commit()
+        run(conn, cfg, args.run_id)
     finally:
         conn.close()
 
@@ -17,7 +17,45 @@ from __future__ import annotations
 
 import sqlite3
 import os
-from typing import Optional
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterator, Optional
+
+
+# Insert statements issued from the simulation hot loop. Keeping the SQL text in
+# one place means every call passes the identical string, so the connection's
+# statement cache parses and plans each one once per process.
+_INSERT_AGENT_SQL = """
+INSERT OR REPLACE INTO agents(run_id, agent_id, address, private_key, executor, agent_type)
+VALUES (?,?,?,?,?,?)
+"""
+_INSERT_TRADE_SQL = """
+INSERT INTO trades
+  (run_id, day, agent_id, side, amount_in_wei, token_in, token_out, tx_hash, status, revert_reason, block_number, gas_used)
+VALUES (?,?,?,?,?,?,?,?,?,?,?,?)
+"""
+_INSERT_FAIR_VALUE_SQL = """
+INSERT OR REPLACE INTO fair_value_daily(run_id, day, fair_value)
+VALUES (?,?,?)
+"""
+_INSERT_PERCEIVED_FAIR_VALUE_SQL = """
+INSERT OR REPLACE INTO perceived_fair_value_daily(run_id, day, avg_perceived_log)
+VALUES (?,?,?)
+"""
+_INSERT_CIRCULATING_SUPPLY_SQL = """
+INSERT OR REPLACE INTO circulating_supply_daily(run_id, day, circulating_supply)
+VALUES (?,?,?)
+"""
+_INSERT_RUN_FACTORS_SQL = """
+INSERT OR REPLACE INTO run_factors_daily(run_id, day, sentiment, fair_value, launch_mult, regime_code, price_norm)
+VALUES (?,?,?,?,?,?,?)
+"""
+_INSERT_TRADE_CAP_SQL = """
+INSERT OR REPLACE INTO trade_cap_daily(run_id, day, side, trade_count, cap_hits)
+VALUES (?,?,?,?,?)
+"""
+_SET_RUN_STAT_SQL = "INSERT OR REPLACE INTO run_stats(key, value) VALUES (?,?)"
 
 
 class SimDB:
@@ -31,45 +69,82 @@ class SimDB:
         self.batch_size = max(1, int(batch_size))
         self._trade_buffer: list[tuple] = []
         self._agent_buffer: list[tuple] = []
-        self.conn = sqlite3.connect(path)
+        # (sql, row) pairs queued inside deferred_writes(); None when writes go straight through.
+        self._deferred: Optional[list[tuple[str, tuple]]] = None
+        # Autocommit mode: transactions are explicit (BEGIN IMMEDIATE ... COMMIT).
+        # Single-shot helpers outside deferred_writes() commit as one statement each.
+        self.conn = sqlite3.connect(path, isolation_level=None, cached_statements=256)
         self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("PRAGMA temp_store=MEMORY;")
+        # Checkpoint the WAL every ~40MB instead of every ~4MB (default 1000 pages);
+        # the writer is append-heavy and nothing reads sim.db until post_run.
+        self.conn.execute("PRAGMA wal_autocheckpoint=10000;")
         if self.fast_mode:
             # Speed-only pragmas for fast mode. Do not affect data shape.
             self.conn.execute("PRAGMA synchronous=OFF;")
-            self.conn.execute("PRAGMA temp_store=MEMORY;")
             self.conn.execute("PRAGMA cache_size=-20000;")  # ~20MB cache
+        else:
+            # WAL stays consistent with NORMAL; only the fsync on every commit is skipped.
+            self.conn.execute("PRAGMA synchronous=NORMAL;")
         self._ensure_schema()
 
     def close(self) -> None:
         self.flush()
         self.conn.close()
 
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """BEGIN IMMEDIATE ... COMMIT, or join the transaction that is already open."""
+        if self.conn.in_transaction:
+            yield
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    @contextmanager
+    def deferred_writes(self) -> Iterator[None]:
+        """
+        Queue insert_* writes in memory instead of executing them.
+
+        flush() writes the queue in one short transaction (the simulator calls it
+        once per simulated day), so no write lock is held while the caller waits on
+        RPCs. Anything still queued is flushed on exit, including when the block raised.
+        """
+        self._deferred = []
+        try:
+            yield
+        finally:
+            self.flush()
+            self._deferred = None
+
+    def _write(self, sql: str, row: tuple) -> None:
+        if self._deferred is not None:
+            self._deferred.append((sql, row))
+        else:
+            self.conn.execute(sql, row)
+
     def flush(self) -> None:
         """
-        Flush buffered inserts when fast_mode is enabled.
+        Flush buffered inserts (fast_mode buffers and deferred writes) in one transaction.
         """
-        if not self.fast_mode:
+        deferred = self._deferred or []
+        if not (self._agent_buffer or self._trade_buffer or deferred):
             return
-        if self._agent_buffer:
-            self.conn.executemany(
-                """
-                INSERT OR REPLACE INTO agents(run_id, agent_id, address, private_key, executor, agent_type)
-                VALUES (?,?,?,?,?,?)
-                """,
-                self._agent_buffer,
-            )
-            self._agent_buffer.clear()
-        if self._trade_buffer:
-            self.conn.executemany(
-                """
-                INSERT INTO trades
-                  (run_id, day, agent_id, side, amount_in_wei, token_in, token_out, tx_hash, status, revert_reason, block_number, gas_used)
-                VALUES (?,?,?,?,?,?,?,?,?,?,?,?)
-                """,
-                self._trade_buffer,
-            )
-            self._trade_buffer.clear()
-        self.conn.commit()
+        with self._transaction():
+            if self._agent_buffer:
+                self.conn.executemany(_INSERT_AGENT_SQL, self._agent_buffer)
+                self._agent_buffer.clear()
+            if self._trade_buffer:
+                self.conn.executemany(_INSERT_TRADE_SQL, self._trade_buffer)
+                self._trade_buffer.clear()
+            for sql, group in groupby(deferred, key=itemgetter(0)):
+                self.conn.executemany(sql, [row for _, row in group])
+            deferred.clear()
 
     def _ensure_schema(self) -> None:
         """
@@ -91,6 +166,9 @@ class SimDB:
               run_end_block INTEGER
             );
 
+            -- "latest run" lookups (ORDER BY created_at_utc DESC LIMIT 1) read one index entry.
+            CREATE INDEX IF NOT EXISTS sim_runs_created ON sim_runs(created_at_utc);
+
             CREATE TABLE IF NOT EXISTS agents (
               run_id TEXT NOT NULL,
               agent_id INTEGER NOT NULL,
@@ -118,6 +196,8 @@ class SimDB:
               created_at_utc TEXT DEFAULT CURRENT_TIMESTAMP
             );
 
+            CREATE INDEX IF NOT EXISTS trades_run_day ON trades(run_id, day, side);
+
             CREATE TABLE IF NOT EXISTS fair_value_daily (
               run_id TEXT NOT NULL,
               day INTEGER NOT NULL,
@@ -213,7 +293,6 @@ class SimDB:
             """,
             (run_id, network, rpc_url, token, pool, weth, created_at_utc),
         )
-        self.conn.commit()
 
     def set_run_block_window(self, run_id: str, start_block: int, end_block: int) -> None:
         """
@@ -227,7 +306,6 @@ class SimDB:
             """,
             (int(start_block), int(end_block), run_id),
         )
-        self.conn.commit()
 
     def get_latest_run_id(self) -> str:
         row = self.conn.execute(
@@ -264,14 +342,7 @@ class SimDB:
             if len(self._agent_buffer) >= self.batch_size:
                 self.flush()
             return
-        self.conn.execute(
-            """
-            INSERT OR REPLACE INTO agents(run_id, agent_id, address, private_key, executor, agent_type)
-            VALUES (?,?,?,?,?,?)
-            """,
-            row,
-        )
-        self.conn.commit()
+        self._write(_INSERT_AGENT_SQL, row)
 
     def insert_trade(
         self,
@@ -307,45 +378,16 @@ class SimDB:
             if len(self._trade_buffer) >= self.batch_size:
                 self.flush()
             return
-        self.conn.execute(
-            """
-            INSERT INTO trades
-              (run_id, day, agent_id, side, amount_in_wei, token_in, token_out, tx_hash, status, revert_reason, block_number, gas_used)
-            VALUES (?,?,?,?,?,?,?,?,?,?,?,?)
-            """,
-            row,
-        )
-        self.conn.commit()
+        self._write(_INSERT_TRADE_SQL, row)
 
     def insert_fair_value(self, run_id: str, day: int, fair_value: float) -> None:
-        self.conn.execute(
-            """
-            INSERT OR REPLACE INTO fair_value_daily(run_id, day, fair_value)
-            VALUES (?,?,?)
-            """,
-            (run_id, int(day), float(fair_value)),
-        )
-        self.conn.commit()
+        self._write(_INSERT_FAIR_VALUE_SQL, (run_id, int(day), float(fair_value)))
 
     def insert_perceived_fair_value(self, run_id: str, day: int, avg_perceived_log: float) -> None:
-        self.conn.execute(
-            """
-            INSERT OR REPLACE INTO perceived_fair_value_daily(run_id, day, avg_perceived_log)
-            VALUES (?,?,?)
-            """,
-            (run_id, int(day), float(avg_perceived_log)),
-        )
-        self.conn.commit()
+        self._write(_INSERT_PERCEIVED_FAIR_VALUE_SQL, (run_id, int(day), float(avg_perceived_log)))
 
     def insert_circulating_supply(self, run_id: str, day: int, circulating_supply: float) -> None:
-        self.conn.execute(
-            """
-            INSERT OR REPLACE INTO circulating_supply_daily(run_id, day, circulating_supply)
-            VALUES (?,?,?)
-            """,
-            (run_id, int(day), float(circulating_supply)),
-        )
-        self.conn.commit()
+        self._write(_INSERT_CIRCULATING_SUPPLY_SQL, (run_id, int(day), float(circulating_supply)))
 
     def insert_run_factors(
         self,
@@ -357,11 +399,8 @@ class SimDB:
         price_norm: Optional[float],
         regime_code: Optional[int] = None,
     ) -> None:
-        self.conn.execute(
-            """
-            INSERT OR REPLACE INTO run_factors_daily(run_id, day, sentiment, fair_value, launch_mult, regime_code, price_norm)
-            VALUES (?,?,?,?,?,?,?)
-            """,
+        self._write(
+            _INSERT_RUN_FACTORS_SQL,
             (
                 run_id,
                 int(day),
@@ -372,21 +411,9 @@ class SimDB:
                 (float(price_norm) if price_norm is not None else None),
             ),
         )
-        self.conn.commit()
 
     def insert_trade_cap_daily(self, run_id: str, day: int, side: str, trade_count: int, cap_hits: int) -> None:
-        self.conn.execute(
-            """
-            INSERT OR REPLACE INTO trade_cap_daily(run_id, day, side, trade_count, cap_hits)
-            VALUES (?,?,?,?,?)
-            """,
-            (run_id, int(day), side, int(trade_count), int(cap_hits)),
-        )
-        self.conn.commit()
+        self._write(_INSERT_TRADE_CAP_SQL, (run_id, int(day), side, int(trade_count), int(cap_hits)))
 
     def set_run_stat(self, key: str, value: str) -> None:
-        self.conn.execute(
-            "INSERT OR REPLACE INTO run_stats(key, value) VALUES (?,?)",
-            (str(key), str(value)),
-        )
-        self.conn.commit()
+        self._write(_SET_RUN_STAT_SQL, (str(key), str(value)))
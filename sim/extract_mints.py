@@ -17,7 +17,7 @@ from typing import Any
 
 from web3 import Web3
 
-from sim.config import load_config
+from sim.config import SimConfig, load_config
 from sim.chain import Chain
 
 ERC721_TRANSFER_EVENT_ABI = [
@@ -45,6 +45,8 @@ def ensure(conn: sqlite3.Connection) -> None:
           token_id TEXT NOT NULL,
           PRIMARY KEY (tx_hash, log_index)
         );
+
+        CREATE INDEX IF NOT EXISTS nft_mints_block ON nft_mints(block_number, tx_hash, log_index);
         """
     )
     conn.commit()
@@ -54,20 +56,11 @@ def u256_to_int(x: Any) -> int:
     return int(x)
 
 
-def main() -> None:
-    if len(sys.argv) != 4:
-        raise SystemExit("Usage: python -m sim.extract_mints <path/to/sim.db> <from_block> <to_block>")
-
-    db_path = sys.argv[1]
-    from_block = int(sys.argv[2])
-    to_block = int(sys.argv[3])
-
-    cfg = load_config()
+def run(conn: sqlite3.Connection, cfg: SimConfig, chain: Chain, from_block: int, to_block: int) -> int:
+    """Extract NFT mints over [from_block, to_block] on an open connection; returns rows inserted."""
     if not cfg.jstvip:
         raise SystemExit("JSTVIP address missing in env/config; cannot extract mints.")
 
-    chain = Chain(cfg.rpc_url, cfg.token, cfg.pool, cfg.weth)
-    conn = sqlite3.connect(db_path)
     ensure(conn)
 
     nft_events_only = chain.w3.eth.contract(address=Web3.to_checksum_address(cfg.jstvip), abi=ERC721_TRANSFER_EVENT_ABI)
@@ -75,37 +68,54 @@ def main() -> None:
 
     print(f"Extracting NFT mints from block {from_block} to {to_block} ...")
 
-    # web3.py 5.x expects fromBlock/toBlock; 6.x accepts from_block/to_block.
-    # Use the camelCase kwargs for compatibility with older installed versions.
-    logs = transfer.get_logs(fromBlock=from_block, toBlock=to_block)
+    logs = chain.get_logs_chunked(transfer, from_block, to_block)
 
-    inserted = 0
+    rows = []
     for ev in logs:
         args = ev["args"]
         from_addr = str(args["from"]).lower()
         if from_addr != "0x0000000000000000000000000000000000000000":
             continue  # not a mint
 
-        tx_hash = ev["transactionHash"].hex()
-        log_index = int(ev["logIndex"])
-        to_addr = str(args["to"]).lower()
-        token_id = str(u256_to_int(args["tokenId"]))
-
-        try:
-            conn.execute(
-                """
-                INSERT INTO nft_mints(tx_hash, log_index, block_number, to_address, token_id)
-                VALUES (?,?,?,?,?)
-                """,
-                (tx_hash, log_index, int(ev["blockNumber"]), to_addr, token_id),
-            )
-            inserted += 1
-        except sqlite3.IntegrityError:
-            pass
+        rows.append((
+            ev["transactionHash"].hex(),
+            int(ev["logIndex"]),
+            int(ev["blockNumber"]),
+            str(args["to"]).lower(),
+            str(u256_to_int(args["tokenId"])),
+        ))
+
+    # Duplicates on (tx_hash, log_index) are skipped by the primary key.
+    before = conn.total_changes
+    conn.executemany(
+        """
+        INSERT OR IGNORE INTO nft_mints(tx_hash, log_index, block_number, to_address, token_id)
+        VALUES (?,?,?,?,?)
+        """,
+        rows,
+    )
+    inserted = conn.total_changes - before
 
     conn.commit()
-    conn.close()
     print(f"Inserted {inserted} new nft_mints rows (raw logs={len(logs)}).")
+    return inserted
+
+
+def main() -> None:
+    if len(sys.argv) != 4:
+        raise SystemExit("Usage: python -m sim.extract_mints <path/to/sim.db> <from_block> <to_block>")
+
+    db_path = sys.argv[1]
+    from_block = int(sys.argv[2])
+    to_block = int(sys.argv[3])
+
+    cfg = load_config()
+    chain = Chain(cfg.rpc_url, cfg.token, cfg.pool, cfg.weth)
+    conn = sqlite3.connect(db_path)
+    try:
+        run(conn, cfg, chain, from_block, to_block)
+    finally:
+        conn.close()
 
 
 if __name__ == "__main__":
@@ -23,7 +23,7 @@ from typing import Any, Optional
 
 from web3 import Web3
 
-from sim.config import load_config
+from sim.config import SimConfig, load_config
 from sim.chain import Chain
 
 # Minimal ABI containing only the Uniswap V3 Swap event.
@@ -45,6 +45,9 @@ UNISWAP_V3_SWAP_EVENT_ABI = [
 ]
 
 
+_RUN_STAT_UPSERT_SQL = "INSERT OR REPLACE INTO run_stats(key, value) VALUES (?,?)"
+
+
 def ensure_tables(conn: sqlite3.Connection) -> None:
     """Create tables for swap events and daily aggregates if missing."""
     conn.executescript(
@@ -94,7 +97,61 @@ def get_run_stat(conn: sqlite3.Connection, key: str) -> Optional[str]:
 
 def set_run_stat(conn: sqlite3.Connection, key: str, value: str) -> None:
     """Upsert a run_stats key/value."""
-    conn.execute("INSERT OR REPLACE INTO run_stats(key, value) VALUES (?,?)", (key, value))
+    conn.execute(_RUN_STAT_UPSERT_SQL, (key, value))
+
+
+def rebuild_daily_market(conn: sqlite3.Connection, day0_block: int, blocks_per_day: int, token_is_0: bool) -> int:
+    """
+    Recompute daily_market from ALL swaps in one SQL aggregation.
+
+    Day mapping prefers the simulation day of the mined trade with the same tx hash,
+    falling back to block bucketing (block - day0_block) / blocks_per_day.
+    int256 amounts are stored as TEXT and routinely exceed int64 in wei, so they are
+    cast to REAL (the volumes are reported in float token units anyway).
+    Returns the number of day rows written.
+    """
+    # Prefer exact simulation-day mapping via mined trade tx hashes.
+    conn.execute("DROP TABLE IF EXISTS temp.mined_tx_day")
+    conn.execute("CREATE TEMP TABLE mined_tx_day (tx_hash TEXT PRIMARY KEY, day INTEGER NOT NULL)")
+    if conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='trades'").fetchone():
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO temp.mined_tx_day(tx_hash, day)
+            SELECT LOWER(tx_hash), day
+            FROM trades
+            WHERE status='MINED' AND tx_hash IS NOT NULL
+            ORDER BY id
+            """
+        )
+
+    # Clear ALL old daily_market rows (prevents stale buckets like 44–50)
+    conn.execute("DELETE FROM daily_market")
+
+    before = conn.total_changes
+    conn.execute(
+        """
+        INSERT INTO daily_market(day, swap_count, volume_token_in, volume_weth_in, volume_weth_total, avg_tick)
+        SELECT day,
+               COUNT(*),
+               SUM(MAX(token_amt, 0)) / 1e18,
+               SUM(MAX(weth_amt, 0)) / 1e18,
+               SUM(ABS(weth_amt)) / 1e18,
+               AVG(tick)
+        FROM (
+          SELECT COALESCE(m.day, (s.block_number - :d0) / :bpd) AS day,
+                 CAST(CASE WHEN :t0 THEN s.amount0 ELSE s.amount1 END AS REAL) AS token_amt,
+                 CAST(CASE WHEN :t0 THEN s.amount1 ELSE s.amount0 END AS REAL) AS weth_amt,
+                 s.tick AS tick
+          FROM swaps s
+          LEFT JOIN temp.mined_tx_day m ON m.tx_hash = LOWER(s.tx_hash)
+        )
+        GROUP BY day
+        """,
+        {"d0": int(day0_block), "bpd": int(blocks_per_day), "t0": 1 if token_is_0 else 0},
+    )
+    written = conn.total_changes - before
+    conn.execute("DROP TABLE temp.mined_tx_day")
+    return written
 
 
 def i256_to_int(x: Any) -> int:
@@ -107,18 +164,8 @@ def u_to_int(x: Any) -> int:
     return int(x)
 
 
-def main() -> None:
-    if len(sys.argv) != 4:
-        raise SystemExit("Usage: python -m sim.extract_swaps sim/out/<run_id>/sim.db <from_block> <to_block>")
-
-    db_path = sys.argv[1]
-    from_block = int(sys.argv[2])
-    to_block = int(sys.argv[3])
-
-    cfg = load_config()
-    chain = Chain(cfg.rpc_url, cfg.token, cfg.pool, cfg.weth)
-
-    conn = sqlite3.connect(db_path)
+def run(conn: sqlite3.Connection, cfg: SimConfig, chain: Chain, from_block: int, to_block: int) -> None:
+    """Extract swaps over [from_block, to_block] and rebuild daily_market on an open connection."""
     ensure_tables(conn)
 
     # Always record extraction window bounds (auditable)
@@ -132,21 +179,16 @@ def main() -> None:
 
     print(f"Extracting swaps from block {from_block} to {to_block} ...")
 
-    # web3.py 5.x expects fromBlock/toBlock; 6.x accepts from_block/to_block.
-    # Use the camelCase kwargs for compatibility with older installed versions.
-    logs = swap_event.get_logs(fromBlock=from_block, toBlock=to_block)
+    logs = chain.get_logs_chunked(swap_event, from_block, to_block)
 
-    # Insert swaps
-    inserted = 0
+    # Insert swaps; duplicates on (tx_hash, log_index) are skipped by the unique index.
+    rows = []
     for ev in logs:
         args = ev["args"]
-        tx_hash = ev["transactionHash"].hex()
-        log_index = ev["logIndex"]
-
-        row = (
+        rows.append((
             int(ev["blockNumber"]),
-            tx_hash,
-            int(log_index),
+            ev["transactionHash"].hex(),
+            int(ev["logIndex"]),
             Web3.to_checksum_address(args["sender"]),
             Web3.to_checksum_address(args["recipient"]),
             str(i256_to_int(args["amount0"])),
@@ -154,23 +196,20 @@ def main() -> None:
             str(u_to_int(args["sqrtPriceX96"])),
             str(u_to_int(args["liquidity"])),
             int(args["tick"]),
-        )
+        ))
 
-        try:
-            conn.execute(
-                """
-                INSERT INTO swaps(
-                  block_number, tx_hash, log_index, sender, recipient,
-                  amount0, amount1, sqrt_price_x96, liquidity, tick
-                )
-                VALUES (?,?,?,?,?,?,?,?,?,?)
-                """,
-                row,
-            )
-            inserted += 1
-        except sqlite3.IntegrityError:
-            # Duplicate (tx_hash, log_index); safe to ignore
-            pass
+    before = conn.total_changes
+    conn.executemany(
+        """
+        INSERT OR IGNORE INTO swaps(
+          block_number, tx_hash, log_index, sender, recipient,
+          amount0, amount1, sqrt_price_x96, liquidity, tick
+        )
+        VALUES (?,?,?,?,?,?,?,?,?,?)
+        """,
+        rows,
+    )
+    inserted = conn.total_changes - before
 
     conn.commit()
     print(f"Inserted {inserted} new swaps (raw logs={len(logs)}).")
@@ -180,7 +219,6 @@ def main() -> None:
     row = conn.execute("SELECT MIN(block_number) FROM swaps").fetchone()
     if not row or row[0] is None:
         print("No swaps present in DB after extraction; skipping day0_block update and daily aggregation.")
-        conn.close()
         return
 
     min_swap_block = int(row[0])
@@ -200,96 +238,28 @@ def main() -> None:
     set_run_stat(conn, "blocks_per_day", str(int(blocks_per_day)))
     print(f"Computing daily aggregates using blocks_per_day={blocks_per_day}...")
 
-    # Prefer exact simulation-day mapping via mined trade tx hashes.
-    # Fallback to block bucketing for any tx not present in trades.
-    mined_day_by_tx: dict[str, int] = {}
-    if conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='trades'").fetchone():
-        for txh, day in conn.execute(
-            """
-            SELECT tx_hash, day
-            FROM trades
-            WHERE status='MINED' AND tx_hash IS NOT NULL
-            """
-        ).fetchall():
-            mined_day_by_tx[str(txh).lower()] = int(day)
-
-    # IMPORTANT:
-    # Rebuild from ALL swaps in DB so results are deterministic and we never keep stale day buckets.
-    rows = conn.execute(
-        "SELECT block_number, tx_hash, amount0, amount1, tick FROM swaps ORDER BY block_number ASC"
-    ).fetchall()
-
     token_is_0 = cfg.token.lower() == cfg.pool_token0.lower()
+    written = rebuild_daily_market(conn, day0_block, blocks_per_day, token_is_0)
+    conn.commit()
+    print(f"Wrote {written} daily_market rows.")
 
-    daily: dict[int, dict[str, float]] = {}
-    for block_number, tx_hash, amount0_s, amount1_s, tick in rows:
-        txh_norm = str(tx_hash).lower()
-        if txh_norm in mined_day_by_tx:
-            day = int(mined_day_by_tx[txh_norm])
-        else:
-            day = (int(block_number) - day0_block) // blocks_per_day
-
-        amount0 = int(amount0_s)
-        amount1 = int(amount1_s)
-
-        token0_in = max(amount0, 0)
-        token1_in = max(amount1, 0)
-
-        if token_is_0:
-            token_in = token0_in
-            weth_in = token1_in
-            weth_total = abs(amount1)
-        else:
-            token_in = token1_in
-            weth_in = token0_in
-            weth_total = abs(amount0)
-
-        token_in_f = token_in / 1e18
-        weth_in_f = weth_in / 1e18
-        weth_total_f = weth_total / 1e18
-
-        if day not in daily:
-            daily[day] = {
-                "swap_count": 0,
-                "volume_token_in": 0.0,
-                "volume_weth_in": 0.0,
-                "volume_weth_total": 0.0,
-                "tick_sum": 0,
-                "tick_n": 0,
-            }
-
-        daily[day]["swap_count"] += 1
-        daily[day]["volume_token_in"] += token_in_f
-        daily[day]["volume_weth_in"] += weth_in_f
-        daily[day]["volume_weth_total"] += weth_total_f
-        daily[day]["tick_sum"] += int(tick)
-        daily[day]["tick_n"] += 1
 
-    # Clear ALL old daily_market rows (prevents stale buckets like 44–50)
-    conn.execute("DELETE FROM daily_market")
+def main() -> None:
+    if len(sys.argv) != 4:
+        raise SystemExit("Usage: python -m sim.extract_swaps sim/out/<run_id>/sim.db <from_block> <to_block>")
 
-    # Insert fresh rows
-    for day, d in daily.items():
-        avg_tick = d["tick_sum"] / max(d["tick_n"], 1)
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO daily_market(day, swap_count, volume_token_in, volume_weth_in, volume_weth_total, avg_tick)
-            VALUES (?,?,?,?,?,?)
-            """,
-            (
-                int(day),
-                int(d["swap_count"]),
-                float(d["volume_token_in"]),
-                float(d["volume_weth_in"]),
-                float(d["volume_weth_total"]),
-                float(avg_tick),
-            ),
-        )
+    db_path = sys.argv[1]
+    from_block = int(sys.argv[2])
+    to_block = int(sys.argv[3])
 
-    conn.commit()
-    print(f"Wrote {len(daily)} daily_market rows.")
+    cfg = load_config()
+    chain = Chain(cfg.rpc_url, cfg.token, cfg.pool, cfg.weth)
 
-    conn.close()
+    conn = sqlite3.connect(db_path)
+    try:
+        run(conn, cfg, chain, from_block, to_block)
+    finally:
+        conn.close()
 
 
 if __name__ == "__main__":
@@ -14,17 +14,24 @@ Notes:
 - Cohort assignment uses the exact same rule as reward_controller_amm_swaps.js:
     bucket = keccak256(f"{address}:{salt}") and bucket % 100 < pct
 - mintedCache is NOT authoritative; minted_onchain is authoritative.
+- minted_onchain is fetched in batches of wallets (one Multicall3 eth_call per batch
+  when the chain has Multicall3, otherwise one raw hasMinted() eth_call per wallet),
+  with batches dispatched concurrently.
+- If `ijson` is installed the state file is streamed (only cumulativeBuys and
+  mintedCache are materialized); otherwise it is parsed with the stdlib json module.
 """
 
 import json
 import os
 import sqlite3
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
 from eth_utils import keccak
 
-from sim.config import load_config
+from sim.config import SimConfig, load_config
 from sim.chain import Chain
 
 
@@ -55,10 +62,6 @@ def ensure_tables(conn: sqlite3.Connection) -> None:
     conn.commit()
 
 
-def to_lower(a: str) -> str:
-    return str(a).lower()
-
-
 def cohort_bucket(address: str, salt: str) -> int:
     """
     Match Node logic:
@@ -67,9 +70,16 @@ def cohort_bucket(address: str, salt: str) -> int:
       bucket = parseInt(h.slice(2, 10), 16) % 100
     """
     s = f"{address.lower()}:{salt}".encode("utf-8")
-    h = keccak(s).hex()  # hex string without 0x
-    first8 = h[:8]
-    return int(first8, 16) % 100
+    # First 4 bytes of the digest == first 8 hex chars.
+    return int.from_bytes(keccak(s)[:4], "big") % 100
+
+
+def cohort_buckets(addresses: list[str], salt: str) -> dict[str, int]:
+    """Bulk form of cohort_bucket for already-lowercased addresses."""
+    h = keccak
+    from_bytes = int.from_bytes
+    suffix = f":{salt}"
+    return {a: from_bytes(h((a + suffix).encode("utf-8"))[:4], "big") % 100 for a in addresses}
 
 
 def is_in_eligible_cohort(address: str, enabled: bool, pct: int, salt: str) -> bool:
@@ -85,6 +95,17 @@ def is_in_eligible_cohort(address: str, enabled: bool, pct: int, salt: str) -> b
     return cohort_bucket(address, salt) < pct
 
 
+def eligible_cohort_map(addresses: list[str], enabled: bool, pct: int, salt: str) -> dict[str, bool]:
+    """Bulk form of is_in_eligible_cohort for already-lowercased addresses."""
+    if not enabled:
+        return dict.fromkeys(addresses, True)
+    if not salt:
+        raise ValueError("COHORT_SALT required when COHORT_ENABLED=true")
+    if pct <= 0 or pct >= 100:
+        return dict.fromkeys(addresses, pct >= 100)
+    return {a: b < pct for a, b in cohort_buckets(addresses, salt).items()}
+
+
 def classify(cohort_eligible: bool, threshold_reached: bool, minted_onchain: bool) -> str:
     """
     4-way segmentation (plus unexpected conditions):
@@ -104,23 +125,103 @@ def classify(cohort_eligible: bool, threshold_reached: bool, minted_onchain: boo
     return "UNKNOWN"
 
 
-def main() -> None:
-    if len(sys.argv) != 3:
-        raise SystemExit("Usage: python -m sim.import_reward_state <sim.db> <reward_state.json>")
+def fetch_minted_onchain(
+    chain: Chain,
+    nft_addr: str,
+    wallets: list[str],
+    *,
+    batch_size: int = 400,
+    max_workers: int = 16,
+) -> dict[str, bool]:
+    """
+    Resolve hasMinted(wallet) for every (lowercase) wallet.
+
+    Calldata is pre-encoded once per wallet (selector + left-padded address) so
+    neither path goes through web3's ContractFunction/ABI codec. Wallets are split
+    into batches of batch_size; each batch is one Multicall3 aggregate3 call when
+    available, otherwise one raw eth_call per wallet. Batches are RPC-latency bound
+    and independent, so they run concurrently on a thread pool. Failed calls count
+    as not minted, as do malformed wallet keys (skipped with a warning).
+    """
+    from web3 import Web3
 
-    db_path = sys.argv[1]
-    state_path = Path(sys.argv[2])
-    if not state_path.exists():
-        raise SystemExit(f"State JSON not found: {state_path}")
+    selector = Web3.keccak(text="hasMinted(address)")[:4]
+    valid_wallets: list[str] = []
+    calldata: list[bytes] = []
+    for w in wallets:
+        try:
+            raw = bytes.fromhex(w[2:]) if len(w) == 42 and w.startswith("0x") else b""
+        except ValueError:
+            raw = b""
+        if len(raw) != 20:
+            print(f"Skipping malformed wallet key {w!r} in reward state (treated as not minted).")
+            continue
+        valid_wallets.append(w)
+        calldata.append(selector + bytes(12) + raw)
+    nft = Web3.to_checksum_address(nft_addr)
+    use_multicall = chain.multicall_available()
+    eth_call = chain.w3.eth.call
+
+    def run_batch(batch: list[bytes]) -> list[Optional[bytes]]:
+        if use_multicall:
+            return chain.multicall([(nft, data) for data in batch])
+        out: list[Optional[bytes]] = []
+        for data in batch:
+            try:
+                out.append(bytes(eth_call({"to": nft, "data": "0x" + data.hex()})))
+            except Exception:
+                out.append(None)
+        return out
+
+    step = max(1, int(batch_size))
+    batches = [calldata[i:i + step] for i in range(0, len(calldata), step)]
+    if len(batches) <= 1:
+        results = run_batch(batches[0]) if batches else []
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as pool:
+            results = [ret for chunk in pool.map(run_batch, batches) for ret in chunk]
+
+    minted = {w: False for w in wallets}
+    minted.update((w, bool(ret) and ret[-1] != 0) for w, ret in zip(valid_wallets, results))
+    return minted
+
+
+def load_state_maps(state_path: Path) -> tuple[dict[str, str], dict[str, bool]]:
+    """
+    Read (cumulativeBuys, mintedCache) from the controller state JSON with lowercase keys.
+
+    Streams the two objects with ijson when available so the rest of the state
+    (and the full document) is never held in memory.
+    """
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+
+    if ijson is None:
+        state = json.loads(state_path.read_text())
+        cumulative_raw = state.get("cumulativeBuys", {}) or {}
+        minted_raw = state.get("mintedCache", {}) or {}
+        return (
+            {str(k).lower(): str(v) for k, v in cumulative_raw.items()},
+            {str(k).lower(): bool(v) for k, v in minted_raw.items()},
+        )
+
+    with state_path.open("rb") as f:
+        cumulative = {str(k).lower(): str(v) for k, v in ijson.kvitems(f, "cumulativeBuys")}
+    with state_path.open("rb") as f:
+        minted_cache = {str(k).lower(): bool(v) for k, v in ijson.kvitems(f, "mintedCache")}
+    return cumulative, minted_cache
 
-    # Load config + chain so we can query on-chain mint truth
-    cfg = load_config()
-    chain = Chain(cfg.rpc_url, cfg.token, cfg.pool, cfg.weth)
 
-    # Read controller state
-    state = json.loads(state_path.read_text())
-    cumulative = state.get("cumulativeBuys", {}) or {}
-    minted_cache = state.get("mintedCache", {}) or {}
+def run(conn: sqlite3.Connection, cfg: SimConfig, chain: Chain, state_path: Path) -> int:
+    """
+    Import/enrich reward_wallets from the controller state file on an open connection.
+
+    Returns the number of reward_wallets rows written.
+    """
+    # Read controller state (keys lowercased once here)
+    cumulative, minted_cache = load_state_maps(state_path)
 
     # Controller env params (must match how controller ran)
     cohort_enabled = (os.getenv("COHORT_ENABLED", "true").strip().lower() in ("true", "1", "yes", "y"))
@@ -135,67 +236,81 @@ def main() -> None:
     if threshold_raw is None:
         raise SystemExit("This importer currently assumes TOKEN_DECIMALS=18 for threshold conversion.")
 
-    conn = sqlite3.connect(db_path)
     ensure_tables(conn)
 
-    # Wallet set = union of seen wallets (cumulative buys or minted cache)
-    wallets = set(to_lower(k) for k in cumulative.keys()) | set(to_lower(k) for k in minted_cache.keys())
+    # Wallet set = union of seen wallets (cumulative buys or minted cache).
+    # load_state_maps already lowercased the keys.
+    wallets = cumulative.keys() | minted_cache.keys()
 
     # Also include all simulation agents (so you can analyze agents that never appeared in controller state)
     agent_rows = conn.execute("SELECT address FROM agents").fetchall()
-    for (addr,) in agent_rows:
-        wallets.add(to_lower(addr))
+    # agents.address is stored lowercase by SimDB.upsert_agent.
+    wallets.update(addr for (addr,) in agent_rows)
 
-    # Prepare NFT contract call for authoritative minted status.
+    # Authoritative minted status from the NFT contract.
     # If JSTVIP not in config (should be), we cannot check on-chain.
     if not cfg.jstvip:
         raise SystemExit("JSTVIP address missing from env; cannot check minted_onchain.")
-    nft = chain.w3.eth.contract(
-        address=Web3.to_checksum_address(cfg.jstvip),
-        abi=[
-            {"inputs": [{"internalType": "address", "name": "", "type": "address"}],
-             "name": "hasMinted",
-             "outputs": [{"internalType": "bool", "name": "", "type": "bool"}],
-             "stateMutability": "view",
-             "type": "function"}
-        ],
-    )
+    ordered_wallets = sorted(wallets)
+    minted_onchain = fetch_minted_onchain(chain, cfg.jstvip, ordered_wallets)
+    eligible_by_wallet = eligible_cohort_map(ordered_wallets, cohort_enabled, cohort_pct, cohort_salt)
 
-    inserted = 0
-    for w in sorted(wallets):
+    rows: list[tuple] = []
+    for w in ordered_wallets:
         cum_raw_s = str(cumulative.get(w, "0"))
         try:
             cum_raw = int(cum_raw_s)
         except Exception:
             cum_raw = 0
 
-        eligible = is_in_eligible_cohort(w, cohort_enabled, cohort_pct, cohort_salt)
+        eligible = eligible_by_wallet[w]
         reached = cum_raw >= threshold_raw
-        cache_minted = 1 if bool(minted_cache.get(w, False)) else 0
-
-        # Authoritative on-chain truth
-        try:
-            minted_chain = bool(nft.functions.hasMinted(Web3.to_checksum_address(w)).call())
-        except Exception:
-            minted_chain = False
+        cache_minted = 1 if minted_cache.get(w, False) else 0
 
+        minted_chain = minted_onchain.get(w, False)
         status = classify(eligible, reached, minted_chain)
 
-        conn.execute(
+        rows.append(
+            (w, str(cum_raw), 1 if eligible else 0, 1 if reached else 0, cache_minted, 1 if minted_chain else 0, status)
+        )
+
+    # Single transaction for the whole batch.
+    with conn:
+        conn.executemany(
             """
             INSERT OR REPLACE INTO reward_wallets
               (wallet, cumulative_buys_raw, cohort_eligible, threshold_reached, minted_cache, minted_onchain, status)
             VALUES (?,?,?,?,?,?,?)
             """,
-            (w, str(cum_raw), 1 if eligible else 0, 1 if reached else 0, cache_minted, 1 if minted_chain else 0, status),
+            rows,
         )
-        inserted += 1
 
-    conn.commit()
-    conn.close()
-
-    print(f"Imported/enriched {inserted} reward_wallets rows.")
+    print(f"Imported/enriched {len(rows)} reward_wallets rows.")
     print("Next: run SQL grouping by status to see the segmentation.")
+    return len(rows)
+
+
+def main() -> None:
+    if len(sys.argv) != 3:
+        raise SystemExit("Usage: python -m sim.import_reward_state <sim.db> <reward_state.json>")
+
+    db_path = sys.argv[1]
+    state_path = Path(sys.argv[2])
+    if not state_path.exists():
+        raise SystemExit(f"State JSON not found: {state_path}")
+
+    # Load config + chain so we can query on-chain mint truth
+    cfg = load_config()
+    chain = Chain(cfg.rpc_url, cfg.token, cfg.pool, cfg.weth)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    try:
+        run(conn, cfg, chain, state_path)
+    finally:
+        conn.close()
 
 
 if __name__ == "__main__":
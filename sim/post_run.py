@@ -17,8 +17,19 @@ What it does (for latest run in sim_runs unless --run-id provided):
    - writes swap_prices + daily_prices (day bucketing aligned to day0_block in run_stats)
 5) extract_mints (run-scoped)
    - extracts NFT mint logs ONLY from [run_start_block, run_end_block]
-6) compute_wallet_activity
+6) compute_cohort_stats
+   - builds cohort_daily_stats (daily cohort + mint counts)
+7) compute_wallet_activity
    - builds wallet_activity (run-scoped mapping wallets -> first_buy_day etc.)
+8) compute_wallet_balances
+   - builds wallet_balances_daily (holder counts + concentration diagnostics)
+9) append_to_warehouse + report
+
+Stages 1-4 are called in-process through each module's run(conn, ...) entrypoint,
+sharing one SQLite connection and one RPC client. Stages 5-8 are independent of
+each other (except cohort stats waiting on mints) and run concurrently in worker
+processes, each with its own connection. The modules remain runnable on their
+own via `python -m sim.<module>`.
 
 Usage:
   python -m sim.post_run <path/to/sim.db> [--run-id RUN_ID]
@@ -28,14 +39,34 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sqlite3
-import subprocess
-import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is the fallback
+    orjson = None
+
+from sim import (
+    compute_cohort_stats,
+    compute_cohorts,
+    compute_prices,
+    compute_wallet_activity,
+    compute_wallet_balances,
+    extract_mints,
+    extract_swaps,
+    import_reward_state,
+)
+from sim.append_to_warehouse import append_to_warehouse
+from sim.chain import Chain
+from sim.config import load_config
+from sim.report import generate_report
+
 
-def _run(cmd: list[str]) -> None:
-    subprocess.check_call(cmd)
+_RUN_STAT_UPSERT_SQL = "INSERT OR REPLACE INTO run_stats(key, value) VALUES (?,?)"
 
 
 def _ensure_run_stats(conn: sqlite3.Connection) -> None:
@@ -87,36 +118,123 @@ def _get_run_meta(conn: sqlite3.Connection, run_id: str) -> dict:
     }
 
 
-def _set_run_stats_window(conn: sqlite3.Connection, start_block: int, end_block: int) -> None:
+def _set_run_stats(conn: sqlite3.Connection, pairs: list[tuple[str, str]]) -> None:
+    """Upsert several run_stats keys in one transaction."""
     _ensure_run_stats(conn)
-    conn.execute("INSERT OR REPLACE INTO run_stats(key, value) VALUES (?,?)", ("day0_block", str(int(start_block))))
-    conn.execute("INSERT OR REPLACE INTO run_stats(key, value) VALUES (?,?)", ("extract_from_block", str(int(start_block))))
-    conn.execute("INSERT OR REPLACE INTO run_stats(key, value) VALUES (?,?)", ("extract_to_block", str(int(end_block))))
-    conn.commit()
+    with conn:
+        conn.executemany(_RUN_STAT_UPSERT_SQL, pairs)
+
 
+@lru_cache(maxsize=None)
+def _load_manifest(path: str) -> dict:
+    """Parse a run manifest once per process (orjson when installed)."""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
-def _set_blocks_per_day(conn: sqlite3.Connection, run_dir: Path, start_block: int, end_block: int) -> None:
+
+def _blocks_per_day(run_dir: Path, start_block: int, end_block: int) -> int:
     """
     Derive blocks_per_day from manifest num_days when available.
     Fallback to 100 if we cannot compute a sensible value.
     """
     blocks_per_day = 100
     manifest = run_dir / "manifest.json"
-    if manifest.exists():
-        try:
-            data = json.loads(manifest.read_text())
-            num_days = int(data.get("num_days", 0))
-            if num_days > 0 and end_block > start_block:
-                blocks_per_day = max(1, (int(end_block) - int(start_block)) // num_days)
-        except Exception:
-            pass
+    try:
+        data = _load_manifest(str(manifest))
+        num_days = int(data.get("num_days", 0))
+        if num_days > 0 and end_block > start_block:
+            blocks_per_day = max(1, (int(end_block) - int(start_block)) // num_days)
+    except Exception:
+        # Missing or unreadable manifest: keep the default.
+        pass
+    return blocks_per_day
 
-    _ensure_run_stats(conn)
-    conn.execute(
-        "INSERT OR REPLACE INTO run_stats(key, value) VALUES (?,?)",
-        ("blocks_per_day", str(int(blocks_per_day))),
-    )
-    conn.commit()
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """
+    Open the run DB for post_run stages.
+
+    Stage modules delimit their own transactions with conn.commit(); with
+    isolation_level="IMMEDIATE" the implicit BEGIN sqlite3 issues before each
+    stage's first write becomes BEGIN IMMEDIATE. That takes the write lock up
+    front, so concurrent stages queue on busy_timeout instead of failing on a
+    deferred read->write upgrade.
+
+    This only holds while every write transaction is short: a stage must do its
+    RPC reads before its first write and commit before the next round of network
+    I/O (see compute_wallet_balances.run). A writer that stays open across RPCs
+    can still push the other stages past the 60s timeout.
+    """
+    conn = sqlite3.connect(db_path, timeout=60, isolation_level="IMMEDIATE")
+    conn.execute("PRAGMA busy_timeout=60000;")
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    conn.execute("PRAGMA mmap_size=268435456;")
+    conn.execute("PRAGMA cache_size=-262144;")
+    return conn
+
+
+# Stages 5-8: name -> stages that must finish first.
+# compute_cohort_stats reads nft_mints, so it waits for extract_mints.
+PARALLEL_STAGES: dict[str, tuple[str, ...]] = {
+    "extract_mints": (),
+    "compute_cohort_stats": ("extract_mints",),
+    "compute_wallet_activity": (),
+    "compute_wallet_balances": (),
+}
+
+
+def _run_stage(stage: str, db_path: str, run_id: str, start_block: int, end_block: int) -> str:
+    """
+    Run one post-run stage in a worker process on its own connection.
+
+    SQLite allows a single writer, so concurrent stages wait on each other's
+    commits (see _connect) instead of failing with "database is locked".
+    """
+    conn = _connect(db_path)
+    try:
+        if stage == "extract_mints":
+            cfg = load_config()
+            chain = Chain(cfg.rpc_url, cfg.token, cfg.pool, cfg.weth)
+            print("Running extract_mints (run-scoped) ...")
+            extract_mints.run(conn, cfg, chain, start_block, end_block)
+        elif stage == "compute_cohort_stats":
+            print("Running compute_cohort_stats ...")
+            compute_cohort_stats.run(conn, run_id)
+        elif stage == "compute_wallet_activity":
+            print("Running compute_wallet_activity ...")
+            compute_wallet_activity.run(conn)
+        elif stage == "compute_wallet_balances":
+            print("Running compute_wallet_balances ...")
+            compute_wallet_balances.run(conn, load_config(), run_id)
+        else:
+            raise ValueError(f"Unknown post_run stage: {stage}")
+    finally:
+        conn.close()
+    return stage
+
+
+def _run_parallel_stages(db_path: str, run_id: str, start_block: int, end_block: int) -> None:
+    """Schedule PARALLEL_STAGES on a process pool, submitting each stage once its deps are done."""
+    pending = dict(PARALLEL_STAGES)
+    done: set[str] = set()
+    max_workers = max(1, min(len(pending), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        running: dict = {}
+        while pending or running:
+            for stage, deps in list(pending.items()):
+                if all(d in done for d in deps):
+                    del pending[stage]
+                    fut = pool.submit(_run_stage, stage, db_path, run_id, start_block, end_block)
+                    running[fut] = stage
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                del running[fut]
+                done.add(fut.result())
 
 
 def main() -> None:
@@ -125,16 +243,24 @@ def main() -> None:
     parser.add_argument("--run-id", dest="run_id", default=None, help="Optional explicit run_id")
     args = parser.parse_args()
 
-    db_path = Path(args.db_path).resolve()
-    if not db_path.exists():
+    # abspath is pure string work; one stat confirms the DB exists.
+    db_path = Path(os.path.abspath(args.db_path))
+    try:
+        os.stat(db_path)
+    except FileNotFoundError:
         raise SystemExit(f"DB not found: {db_path}")
 
+    # Resolve paths once; every stage below reuses these.
+    db_str = str(db_path)
     run_dir = db_path.parent
+    warehouse = Path(__file__).resolve().parent / "warehouse.db"
 
-    conn = sqlite3.connect(str(db_path))
+    # Stages 1-4 run in-process on one connection (no per-stage interpreter start/reconnect).
+    conn = _connect(db_str)
     try:
         run_id = args.run_id or _get_latest_run_id(conn)
         meta = _get_run_meta(conn, run_id)
+        start_block, end_block = meta["run_start_block"], meta["run_end_block"]
 
         print("post_run starting")
         print(f"  network={meta['network']}")
@@ -142,87 +268,69 @@ def main() -> None:
         print(f"  db={db_path}")
         print(f"  run_id={run_id}")
         print(f"  run_dir={run_dir}")
-        print(f"  run block window: start={meta['run_start_block']} end={meta['run_end_block']}")
-    finally:
-        conn.close()
-
-    # 1) compute cohorts (also builds run_wallets)
-    print("Running compute_cohorts ...")
-    _run([sys.executable, "-m", "sim.compute_cohorts", str(db_path), "--run-id", run_id])
-
-    # 2) reward_state import (optional)
-    reward_state = run_dir / "reward_state_local.json"
-    if reward_state.exists():
-        print("Running import_reward_state ...")
-        _run([sys.executable, "-m", "sim.import_reward_state", str(db_path), str(reward_state)])
-    else:
-        print(f"Note: {reward_state} not found; skipping import_reward_state.")
-
-    # 3) run-scoped swap extraction + day0 alignment
-    conn = sqlite3.connect(str(db_path))
-    try:
-        _set_run_stats_window(conn, meta["run_start_block"], meta["run_end_block"])
-        _set_blocks_per_day(conn, run_dir, meta["run_start_block"], meta["run_end_block"])
-    finally:
-        conn.close()
+        print(f"  run block window: start={start_block} end={end_block}")
+
+        cfg = load_config()
+        chain = Chain(cfg.rpc_url, cfg.token, cfg.pool, cfg.weth)
+
+        # 1) compute cohorts (also builds run_wallets)
+        print("Running compute_cohorts ...")
+        compute_cohorts.run(conn, run_id)
+
+        # 2) reward_state import (optional)
+        reward_state = run_dir / "reward_state_local.json"
+        if reward_state.exists():
+            print("Running import_reward_state ...")
+            import_reward_state.run(conn, cfg, chain, reward_state)
+        else:
+            print(f"Note: {reward_state} not found; skipping import_reward_state.")
+
+        # 3) run-scoped swap extraction + day0 alignment
+        _set_run_stats(
+            conn,
+            [
+                ("day0_block", str(int(start_block))),
+                ("extract_from_block", str(int(start_block))),
+                ("extract_to_block", str(int(end_block))),
+                ("blocks_per_day", str(int(_blocks_per_day(run_dir, start_block, end_block)))),
+            ],
+        )
 
-    print("Running extract_swaps (run-scoped) ...")
-    _run(
-        [
-            sys.executable,
-            "-m",
-            "sim.extract_swaps",
-            str(db_path),
-            str(meta["run_start_block"]),
-            str(meta["run_end_block"]),
-        ]
-    )
+        print("Running extract_swaps (run-scoped) ...")
+        extract_swaps.run(conn, cfg, chain, start_block, end_block)
 
-    # 4) prices (only if swaps exist)
-    conn = sqlite3.connect(str(db_path))
-    try:
-        swap_count = conn.execute("SELECT COUNT(1) FROM swaps").fetchone()[0]
+        # 4) prices (only if swaps exist)
+        has_swaps = conn.execute("SELECT EXISTS(SELECT 1 FROM swaps LIMIT 1)").fetchone()[0]
+        if has_swaps:
+            print("Running compute_prices ...")
+            compute_prices.run(conn, cfg)
+        else:
+            print("No swaps found; skipping compute_prices.")
     finally:
         conn.close()
-    if swap_count:
-        print("Running compute_prices ...")
-        _run([sys.executable, "-m", "sim.compute_prices", str(db_path)])
-    else:
-        print("No swaps found; skipping compute_prices.")
-
-    # 5) run-scoped mint extraction
-    print("Running extract_mints (run-scoped) ...")
-    _run(
-        [
-            sys.executable,
-            "-m",
-            "sim.extract_mints",
-            str(db_path),
-            str(meta["run_start_block"]),
-            str(meta["run_end_block"]),
-        ]
-    )
 
-    # 6) cohort + mint daily stats
-    print("Running compute_cohort_stats ...")
-    _run([sys.executable, "-m", "sim.compute_cohort_stats", str(db_path), "--run-id", run_id])
-
-    # 7) wallet activity
-    print("Running compute_wallet_activity ...")
-    _run([sys.executable, "-m", "sim.compute_wallet_activity", str(db_path)])
-
-    # 8) wallet balances (holder counts + concentration diagnostics)
-    print("Running compute_wallet_balances ...")
-    _run([sys.executable, "-m", "sim.compute_wallet_balances", str(db_path), "--run-id", run_id])
+    # 5-8) stages that only depend on swaps/run_stats above; fan out across processes.
+    _run_parallel_stages(db_str, run_id, start_block, end_block)
 
     # 9) append to warehouse for cross-run analytics
     print("Appending run to warehouse ...")
-    _run([sys.executable, "-m", "sim.append_to_warehouse", "--run-db", str(db_path)])
+    append_to_warehouse(db_path, warehouse)
 
     # 10) generate report plots scoped to this run_id
+    # Must follow the append: the report reads this run's rows (including
+    # wallet_balances_daily from step 8) from the warehouse, not the run DB.
     report_outdir = Path("sim/reports") / run_id
     print(f"Generating report for run_id={run_id} ... ({report_outdir})")
-    _run([sys.executable, "-m", "sim.report", "--outdir", str(report_outdir), "--runs", run_id])
+    generate_report(warehouse, report_outdir, [run_id])
+
+    # Keep planner stats fresh for later report/warehouse reads (cheap with analysis_limit).
+    for path in (db_str, str(warehouse)):
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute("PRAGMA analysis_limit=1000;")
+            conn.execute("PRAGMA optimize;")
+        finally:
+            conn.close()
 
     print("post_run complete.")
 
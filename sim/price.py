@@ -18,19 +18,30 @@ We store:
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from typing import Iterable, NamedTuple
 
 
 Q96 = 2 ** 96
+_INV_Q96 = 1.0 / Q96
 
 
 def sqrt_price_x96_to_price_token1_per_token0(sqrt_price_x96: int) -> float:
     """Convert sqrtPriceX96 to price = token1/token0."""
-    sp = sqrt_price_x96 / Q96
+    sp = sqrt_price_x96 * _INV_Q96
     return sp * sp
 
 
-@dataclass(frozen=True)
-class PriceResult:
+def sqrt_prices_x96_to_prices_token1_per_token0(sqrt_prices_x96: Iterable[int]) -> list[float]:
+    """Bulk version of sqrt_price_x96_to_price_token1_per_token0 for a column of swaps."""
+    inv = _INV_Q96
+    out = []
+    append = out.append
+    for v in sqrt_prices_x96:
+        sp = v * inv
+        append(sp * sp)
+    return out
+
+
+class PriceResult(NamedTuple):
     price_weth_per_token: float
     normalized_price: float
@@ -18,14 +18,20 @@ from __future__ import annotations
 import argparse
 import json
 import math
+import os
 import random
 import sqlite3
 import statistics
+import threading
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache, partial
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -77,13 +83,44 @@ def _cohort_group_color(group_key: str) -> str:
     return "#444444"
 
 
+class _ReportConnection(sqlite3.Connection):
+    """
+    Warehouse connection for reporting. The connection is query_only, so the
+    table list cannot change underneath it and is read from the schema once.
+    """
+
+    table_names: Optional[frozenset] = None
+
+
 def _connect(path: Path) -> sqlite3.Connection:
     if not path.exists():
         raise FileNotFoundError(f"Warehouse DB not found: {path}")
-    return sqlite3.connect(str(path))
+    # Reporting only reads: no implicit transactions, a large page cache and
+    # mmap so the run_swaps/run_swap_prices scans avoid per-page copies. The
+    # per-run loaders reuse a few dozen SQL strings, so a bigger statement
+    # cache keeps them all prepared for the whole report.
+    conn = sqlite3.connect(
+        str(path),
+        isolation_level=None,
+        cached_statements=512,
+        factory=_ReportConnection,
+        # Loader threads each own a connection; it is only closed elsewhere.
+        check_same_thread=False,
+    )
+    conn.execute("PRAGMA query_only=ON;")
+    conn.execute("PRAGMA cache_size=-262144;")
+    conn.execute("PRAGMA mmap_size=1073741824;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    return conn
 
 
 def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    if isinstance(conn, _ReportConnection):
+        if conn.table_names is None:
+            conn.table_names = frozenset(
+                r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            )
+        return name in conn.table_names
     row = conn.execute(
         "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
         (name,),
@@ -96,6 +133,25 @@ def _table_has_column(conn: sqlite3.Connection, table: str, column: str) -> bool
     return any(str(r[1]) == column for r in rows)
 
 
+def _rows_by_run(
+    conn: sqlite3.Connection,
+    sql: str,
+    run_ids: List[str],
+) -> Dict[str, List[tuple]]:
+    """
+    Run one query for all runs and bucket the rows by run_id.
+
+    `sql` must select run_id first, filter with `run_id IN ({ids})` and order by
+    run_id. Returned rows drop the run_id column; every requested run gets an
+    entry (possibly empty), in run_ids order.
+    """
+    if not run_ids:
+        return {}
+    cur = conn.execute(sql.format(ids=",".join("?" * len(run_ids))), list(run_ids))
+    grouped = {rid: [r[1:] for r in rows] for rid, rows in groupby(cur, key=itemgetter(0))}
+    return {rid: grouped.get(rid, []) for rid in run_ids}
+
+
 def _load_manifest_for_run(run_id: str) -> Optional[dict]:
     base = Path(__file__).resolve().parent / "out" / run_id / "manifest.json"
     if not base.exists():
@@ -129,79 +185,30 @@ def _load_runs(conn: sqlite3.Connection) -> Dict[str, RunMeta]:
     }
 
 
-def _load_run_ids_ordered(conn: sqlite3.Connection) -> List[str]:
-    rows = conn.execute(
-        "SELECT run_id FROM runs ORDER BY created_at_utc ASC"
-    ).fetchall()
-    return [r[0] for r in rows]
-
-
-def _load_run_summary(conn: sqlite3.Connection, run_id: str) -> Optional[dict]:
-    has_weth_total = _table_has_column(conn, "run_summary", "total_volume_weth_total")
-    if has_weth_total:
-        row = conn.execute(
-            """
-            SELECT run_id, trade_count, mined_trades, reverted_trades, buy_trades, sell_trades,
-                   swap_events, mint_events, anchor_price, anchor_day,
-                   total_volume_token_in, total_volume_weth_in, total_volume_weth_total, price_days, market_days
-            FROM run_summary WHERE run_id=?
-            """,
-            (run_id,),
-        ).fetchone()
-    else:
-        row = conn.execute(
-            """
-            SELECT run_id, trade_count, mined_trades, reverted_trades, buy_trades, sell_trades,
-                   swap_events, mint_events, anchor_price, anchor_day,
-                   total_volume_token_in, total_volume_weth_in, price_days, market_days
-            FROM run_summary WHERE run_id=?
-            """,
-            (run_id,),
-        ).fetchone()
-    if not row:
-        return None
-    if has_weth_total:
-        keys = [
-            "run_id",
-            "trade_count",
-            "mined_trades",
-            "reverted_trades",
-            "buy_trades",
-            "sell_trades",
-            "swap_events",
-            "mint_events",
-            "anchor_price",
-            "anchor_day",
-            "total_volume_token_in",
-            "total_volume_weth_in",
-            "total_volume_weth_total",
-            "price_days",
-            "market_days",
-        ]
-        return dict(zip(keys, row))
-    out = dict(
-        zip(
-            [
-                "run_id",
-                "trade_count",
-                "mined_trades",
-                "reverted_trades",
-                "buy_trades",
-                "sell_trades",
-                "swap_events",
-                "mint_events",
-                "anchor_price",
-                "anchor_day",
-                "total_volume_token_in",
-                "total_volume_weth_in",
-                "price_days",
-                "market_days",
-            ],
-            row,
-        )
+def _load_run_summaries(conn: sqlite3.Connection, run_ids: List[str]) -> Dict[str, dict]:
+    """
+    Returns {run_id: run_summary row as a dict} for the runs that have one.
+    """
+    if not run_ids:
+        return {}
+    # Older warehouses lack total_volume_weth_total; alias weth_in in its place.
+    weth_total_col = (
+        "total_volume_weth_total"
+        if _table_has_column(conn, "run_summary", "total_volume_weth_total")
+        else "total_volume_weth_in AS total_volume_weth_total"
     )
-    out["total_volume_weth_total"] = out.get("total_volume_weth_in")
-    return out
+    cur = conn.execute(
+        f"""
+        SELECT run_id, trade_count, mined_trades, reverted_trades, buy_trades, sell_trades,
+               swap_events, mint_events, anchor_price, anchor_day,
+               total_volume_token_in, total_volume_weth_in, {weth_total_col}, price_days, market_days
+        FROM run_summary WHERE run_id IN ({",".join("?" * len(run_ids))})
+        """,
+        list(run_ids),
+    )
+    keys = [col[0] for col in cur.description]
+    by_run = {row[0]: dict(zip(keys, row)) for row in cur}
+    return {rid: by_run[rid] for rid in run_ids if rid in by_run}
 
 
 def _load_daily_prices(conn: sqlite3.Connection, run_id: str) -> List[dict]:
@@ -317,7 +324,9 @@ def _load_daily_close_prices(conn: sqlite3.Connection, run_id: str) -> List[dict
         if day0_block <= 0 or blocks_per_day <= 0:
             sparse = _load_daily_prices(conn, run_id)
         else:
-            rows = conn.execute(
+            # One row per swap: stream the cursor and keep only the latest
+            # price per day rather than materializing every row first.
+            cur = conn.execute(
                 """
                 SELECT block_number, normalized_price
                 FROM run_swap_prices
@@ -325,14 +334,13 @@ def _load_daily_close_prices(conn: sqlite3.Connection, run_id: str) -> List[dict
                 ORDER BY block_number ASC
                 """,
                 (run_id,),
-            ).fetchall()
-            if not rows:
+            )
+            closes: Dict[int, float] = {}
+            for block_number, price in cur:
+                closes[(int(block_number) - day0_block) // blocks_per_day] = float(price)
+            if not closes:
                 sparse = _load_daily_prices(conn, run_id)
             else:
-                closes: Dict[int, float] = {}
-                for block_number, price in rows:
-                    day = int((int(block_number) - day0_block) // blocks_per_day)
-                    closes[day] = float(price)
                 sparse = [{"day": day, "avg_normalized_price": price} for day, price in sorted(closes.items())]
 
     if not sparse:
@@ -356,52 +364,40 @@ def _load_daily_close_prices(conn: sqlite3.Connection, run_id: str) -> List[dict
     return dense
 
 
-def _load_daily_market(conn: sqlite3.Connection, run_id: str) -> List[dict]:
+def _load_daily_market(conn: sqlite3.Connection, run_ids: List[str]) -> Dict[str, List[dict]]:
     if not _table_exists(conn, "run_daily_market"):
-        return []
-    has_weth_total = _table_has_column(conn, "run_daily_market", "volume_weth_total")
-    if has_weth_total:
-        rows = conn.execute(
-            """
-            SELECT day, swap_count, volume_token_in, volume_weth_in, volume_weth_total, avg_tick
-            FROM run_daily_market
-            WHERE run_id=?
-            ORDER BY day ASC
-            """,
-            (run_id,),
-        ).fetchall()
-        sparse = [
-            {
-                "day": int(day),
-                "swap_count": int(cnt),
-                "volume_token_in": float(vt),
-                "volume_weth_in": float(vw),
-                "volume_weth_total": float(vwt),
-                "avg_tick": float(tick),
-            }
-            for day, cnt, vt, vw, vwt, tick in rows
-        ]
-    else:
-        rows = conn.execute(
-            """
-            SELECT day, swap_count, volume_token_in, volume_weth_in, avg_tick
-            FROM run_daily_market
-            WHERE run_id=?
-            ORDER BY day ASC
-            """,
-            (run_id,),
-        ).fetchall()
-        sparse = [
-            {
-                "day": int(day),
-                "swap_count": int(cnt),
-                "volume_token_in": float(vt),
-                "volume_weth_in": float(vw),
-                "volume_weth_total": float(vw),
-                "avg_tick": float(tick),
-            }
-            for day, cnt, vt, vw, tick in rows
-        ]
+        return {rid: [] for rid in run_ids}
+    # Older warehouses lack volume_weth_total; fall back to volume_weth_in.
+    weth_total_col = (
+        "volume_weth_total"
+        if _table_has_column(conn, "run_daily_market", "volume_weth_total")
+        else "volume_weth_in"
+    )
+    rows_by_run = _rows_by_run(
+        conn,
+        f"""
+        SELECT run_id, day, swap_count, volume_token_in, volume_weth_in, {weth_total_col}, avg_tick
+        FROM run_daily_market
+        WHERE run_id IN ({{ids}})
+        ORDER BY run_id, day ASC
+        """,
+        run_ids,
+    )
+    return {rid: _densify_daily_market(conn, rid, rows) for rid, rows in rows_by_run.items()}
+
+
+def _densify_daily_market(conn: sqlite3.Connection, run_id: str, rows: List[tuple]) -> List[dict]:
+    sparse = [
+        {
+            "day": int(day),
+            "swap_count": int(cnt),
+            "volume_token_in": float(vt),
+            "volume_weth_in": float(vw),
+            "volume_weth_total": float(vwt),
+            "avg_tick": float(tick),
+        }
+        for day, cnt, vt, vw, vwt, tick in rows
+    ]
     if not sparse:
         return sparse
 
@@ -431,21 +427,17 @@ def _load_daily_market(conn: sqlite3.Connection, run_id: str) -> List[dict]:
     return dense
 
 
-def _load_daily_returns(conn: sqlite3.Connection, run_id: str) -> List[dict]:
-    closes = _load_daily_close_prices(conn, run_id)
+def _daily_returns_from_closes(closes: List[dict]) -> List[dict]:
     rows = [(int(r["day"]), float(r["avg_normalized_price"])) for r in closes]
     if len(rows) < 2:
         return []
     # Drop the last day to avoid partial-day artifacts at run boundaries.
     rows = rows[:-1]
-    returns = []
-    prev_price = float(rows[0][1])
-    for day, price in rows[1:]:
-        price_f = float(price)
-        ret = (price_f / prev_price) - 1.0 if prev_price > 0 else 0.0
-        returns.append({"day": int(day), "return": ret})
-        prev_price = price_f
-    return returns
+    # Pair each day with the previous close in one pass (prices are already floats).
+    return [
+        {"day": day, "return": (price / prev) - 1.0 if prev > 0 else 0.0}
+        for (_, prev), (day, price) in zip(rows, rows[1:])
+    ]
 
 
 def _load_trade_sizes(conn: sqlite3.Connection) -> Dict[str, List[float]]:
@@ -454,61 +446,53 @@ def _load_trade_sizes(conn: sqlite3.Connection) -> Dict[str, List[float]]:
     """
     if not _table_exists(conn, "run_trades"):
         return {"BUY": [], "SELL": []}
-    rows = conn.execute(
+    # BUY sizes are WETH in / day avg price; SELL sizes are already TOKEN in.
+    cur = conn.execute(
         """
-        SELECT t.side, t.amount_in_wei, p.avg_price_weth_per_token
+        SELECT t.side,
+               CAST(t.amount_in_wei AS REAL) / 1e18
+                 / CASE WHEN t.side = 'BUY' THEN p.avg_price_weth_per_token ELSE 1.0 END
         FROM run_trades t
         LEFT JOIN run_daily_prices p
           ON p.run_id = t.run_id AND p.day = t.day
         WHERE t.status='MINED'
+          AND t.side IN ('BUY', 'SELL')
+          AND CAST(t.amount_in_wei AS REAL) > 0
+          AND (t.side <> 'BUY' OR p.avg_price_weth_per_token > 0)
         """
-    ).fetchall()
+    )
     sizes = {"BUY": [], "SELL": []}
-    for side, amt, avg_price in rows:
-        try:
-            amt_in = float(int(amt)) / 1e18
-            if amt_in <= 0:
-                continue
-            side_str = str(side)
-            if side_str == "BUY":
-                price = float(avg_price) if avg_price is not None else 0.0
-                if price <= 0:
-                    continue
-                sizes[side_str].append(amt_in / price)
-            else:
-                sizes[side_str].append(amt_in)
-        except Exception:
-            continue
+    buys = sizes["BUY"]
+    sells = sizes["SELL"]
+    for side, size in cur:
+        (buys if side == "BUY" else sells).append(size)
     return sizes
 
 
-def _load_fair_values(conn: sqlite3.Connection, run_id: str) -> List[dict]:
+def _load_fair_values(conn: sqlite3.Connection, run_ids: List[str]) -> Dict[str, List[dict]]:
     if _table_exists(conn, "run_factors_daily"):
-        rows = conn.execute(
-            """
-            SELECT day, fair_value
-            FROM run_factors_daily
-            WHERE run_id=?
-            ORDER BY day ASC
-            """,
-            (run_id,),
-        ).fetchall()
+        table = "run_factors_daily"
     elif _table_exists(conn, "run_fair_value_daily"):
-        rows = conn.execute(
-            """
-            SELECT day, fair_value
-            FROM run_fair_value_daily
-            WHERE run_id=?
-            ORDER BY day ASC
-            """,
-            (run_id,),
-        ).fetchall()
+        table = "run_fair_value_daily"
     else:
-        rows = []
-    return [{"day": int(day), "fair_value": float(val)} for day, val in rows]
+        return {rid: [] for rid in run_ids}
+    rows_by_run = _rows_by_run(
+        conn,
+        f"""
+        SELECT run_id, day, fair_value
+        FROM {table}
+        WHERE run_id IN ({{ids}})
+        ORDER BY run_id, day ASC
+        """,
+        run_ids,
+    )
+    return {
+        rid: [{"day": int(day), "fair_value": float(val)} for day, val in rows]
+        for rid, rows in rows_by_run.items()
+    }
 
 
-def _load_regime_trace(conn: sqlite3.Connection, run_id: str) -> List[dict]:
+def _load_regime_trace(conn: sqlite3.Connection, run_ids: List[str]) -> Dict[str, List[dict]]:
     """
     Load regime trace.
     Preferred path uses exact stored regime_code from run_factors_daily:
@@ -516,60 +500,50 @@ def _load_regime_trace(conn: sqlite3.Connection, run_id: str) -> List[dict]:
     Fallback for older runs infers from launch_mult/sentiment.
     """
     if not _table_exists(conn, "run_factors_daily"):
-        return []
+        return {rid: [] for rid in run_ids}
     has_regime_code = _table_has_column(conn, "run_factors_daily", "regime_code")
-    if has_regime_code:
-        rows = conn.execute(
-            """
-            SELECT day, sentiment, regime_code, launch_mult
-            FROM run_factors_daily
-            WHERE run_id=?
-            ORDER BY day ASC
-            """,
-            (run_id,),
-        ).fetchall()
+    regime_code_col = "regime_code" if has_regime_code else "NULL as regime_code"
+    rows_by_run = _rows_by_run(
+        conn,
+        f"""
+        SELECT run_id, day, sentiment, {regime_code_col}, launch_mult
+        FROM run_factors_daily
+        WHERE run_id IN ({{ids}})
+        ORDER BY run_id, day ASC
+        """,
+        run_ids,
+    )
+    return {rid: [_regime_point(*r) for r in rows] for rid, rows in rows_by_run.items()}
+
+
+def _regime_point(day, sentiment, regime_code_raw, launch_mult) -> dict:
+    sent = float(sentiment)
+    if regime_code_raw is not None:
+        regime_code = int(regime_code_raw)
+        if regime_code == 2:
+            regime = "hype"
+        elif regime_code == 1:
+            regime = "bull"
+        else:
+            regime = "bear"
     else:
-        rows = conn.execute(
-            """
-            SELECT day, sentiment, NULL as regime_code, launch_mult
-            FROM run_factors_daily
-            WHERE run_id=?
-            ORDER BY day ASC
-            """,
-            (run_id,),
-        ).fetchall()
-    out: List[dict] = []
-    for day, sentiment, regime_code_raw, launch_mult in rows:
-        sent = float(sentiment)
-        if regime_code_raw is not None:
-            regime_code = int(regime_code_raw)
-            if regime_code == 2:
-                regime = "hype"
-            elif regime_code == 1:
-                regime = "bull"
-            else:
-                regime = "bear"
+        # Backward-compatible fallback for legacy runs.
+        hype_flag = float(launch_mult)
+        if hype_flag >= 0.5:
+            regime = "hype"
+            regime_code = 2
+        elif sent >= 0.0:
+            regime = "bull"
+            regime_code = 1
         else:
-            # Backward-compatible fallback for legacy runs.
-            hype_flag = float(launch_mult)
-            if hype_flag >= 0.5:
-                regime = "hype"
-                regime_code = 2
-            elif sent >= 0.0:
-                regime = "bull"
-                regime_code = 1
-            else:
-                regime = "bear"
-                regime_code = 0
-        out.append(
-            {
-                "day": int(day),
-                "regime": regime,
-                "regime_code": int(regime_code),
-                "sentiment": sent,
-            }
-        )
-    return out
+            regime = "bear"
+            regime_code = 0
+    return {
+        "day": int(day),
+        "regime": regime,
+        "regime_code": int(regime_code),
+        "sentiment": sent,
+    }
 
 
 def _load_perceived_fair_values(conn: sqlite3.Connection, run_id: str) -> List[dict]:
@@ -588,53 +562,99 @@ def _load_perceived_fair_values(conn: sqlite3.Connection, run_id: str) -> List[d
     return [{"day": int(day), "avg_perceived_log": float(val)} for day, val in rows]
 
 
-def _load_wallet_balances(conn: sqlite3.Connection, run_id: str) -> Dict[int, List[int]]:
+def _load_daily_holder_stats(conn: sqlite3.Connection, run_ids: List[str]) -> Dict[str, List[dict]]:
     """
-    Returns {day: [balances]} for holder count + concentration.
+    Returns {run_id: [{day, holders, top10}]} aggregated in SQL, one row per
+    (run, day) instead of one per wallet balance.
+
+    Balances are int256 TEXT; they are ranked and summed as REAL, which is
+    ample precision for a share. Days where nobody holds report 0 holders and a
+    0.0 share so the merged timeline keeps every day.
     """
     if not _table_exists(conn, "run_wallet_balances_daily"):
-        return {}
-    rows = conn.execute(
+        return {rid: [] for rid in run_ids}
+    rows_by_run = _rows_by_run(
+        conn,
         """
-        SELECT day, token_balance_raw
-        FROM run_wallet_balances_daily
-        WHERE run_id=?
-        ORDER BY day ASC
+        SELECT run_id, day,
+               SUM(bal > 0) AS holders,
+               COALESCE(
+                 SUM(CASE WHEN rn <= 10 AND bal > 0 THEN bal END)
+                   / SUM(CASE WHEN bal > 0 THEN bal END),
+                 0.0
+               ) AS top10
+        FROM (
+          SELECT run_id, day, CAST(token_balance_raw AS REAL) AS bal,
+                 ROW_NUMBER() OVER (
+                   PARTITION BY run_id, day ORDER BY CAST(token_balance_raw AS REAL) DESC
+                 ) AS rn
+          FROM run_wallet_balances_daily
+          WHERE run_id IN ({ids})
+        )
+        GROUP BY run_id, day
+        ORDER BY run_id, day ASC
         """,
-        (run_id,),
-    ).fetchall()
-    by_day: Dict[int, List[int]] = {}
-    for day, bal in rows:
-        by_day.setdefault(int(day), []).append(int(bal))
-    return by_day
+        run_ids,
+    )
+    return {
+        rid: [{"day": int(day), "holders": int(holders), "top10": float(top10)} for day, holders, top10 in rows]
+        for rid, rows in rows_by_run.items()
+    }
 
 
-def _load_swap_ticks_prices(conn: sqlite3.Connection, run_id: str) -> List[tuple]:
-    if not _table_exists(conn, "run_swap_prices"):
-        return []
-    return conn.execute(
-        """
-        SELECT tick, normalized_price
+def _load_swap_ticks_prices(
+    conn: sqlite3.Connection,
+    run_ids: List[str],
+) -> Dict[str, Tuple[List[float], List[float]]]:
+    """
+    Returns {run_id: (ticks, prices)} as parallel columns, streamed off the cursor.
+    """
+    out: Dict[str, Tuple[List[float], List[float]]] = {rid: ([], []) for rid in run_ids}
+    if not run_ids or not _table_exists(conn, "run_swap_prices"):
+        return out
+    cur = conn.execute(
+        f"""
+        SELECT run_id, CAST(tick AS REAL), normalized_price
         FROM run_swap_prices
-        WHERE run_id=?
-        ORDER BY block_number ASC
+        WHERE run_id IN ({",".join("?" * len(run_ids))})
+        ORDER BY run_id, block_number ASC
         """,
-        (run_id,),
-    ).fetchall()
+        list(run_ids),
+    )
+    for rid, rows in groupby(cur, key=itemgetter(0)):
+        ticks, prices = out[rid]
+        for _, t, p in rows:
+            ticks.append(t)
+            prices.append(p)
+    return out
 
 
-def _load_liquidity_series(conn: sqlite3.Connection, run_id: str) -> List[tuple]:
-    if not _table_exists(conn, "run_swaps"):
-        return []
-    return conn.execute(
-        """
-        SELECT block_number, liquidity, tick
+def _load_liquidity_series(
+    conn: sqlite3.Connection,
+    run_ids: List[str],
+) -> Dict[str, Tuple[List[int], List[float]]]:
+    """
+    Returns {run_id: (blocks, liquidity)} as parallel columns, streamed off the cursor.
+    """
+    out: Dict[str, Tuple[List[int], List[float]]] = {rid: ([], []) for rid in run_ids}
+    if not run_ids or not _table_exists(conn, "run_swaps"):
+        return out
+    # liquidity is a uint128 TEXT column; unparseable values plot as 0.
+    cur = conn.execute(
+        f"""
+        SELECT run_id, block_number, COALESCE(CAST(liquidity AS REAL), 0.0)
         FROM run_swaps
-        WHERE run_id=?
-        ORDER BY block_number ASC
+        WHERE run_id IN ({",".join("?" * len(run_ids))})
+        ORDER BY run_id, block_number ASC
         """,
-        (run_id,),
-    ).fetchall()
+        list(run_ids),
+    )
+    for rid, rows in groupby(cur, key=itemgetter(0)):
+        blocks, liqs = out[rid]
+        for _, b, lq in rows:
+            blocks.append(b)
+            liqs.append(lq)
+    return out
 
 
 def _load_repeat_buy_rates(conn: sqlite3.Connection) -> Dict[str, dict]:
@@ -644,29 +664,29 @@ def _load_repeat_buy_rates(conn: sqlite3.Connection) -> Dict[str, dict]:
     """
     if not _table_exists(conn, "run_wallet_activity") or not _table_exists(conn, "run_wallet_cohorts"):
         return {}
+    # Both tables are keyed (run_id, address), so the join is an index lookup and
+    # the aggregation returns O(runs) rows instead of one per wallet.
     rows = conn.execute(
         """
-        SELECT a.run_id, c.eligible, a.buy_count
+        SELECT a.run_id,
+               CASE WHEN c.eligible = 1 THEN 'eligible' ELSE 'control' END AS cohort,
+               SUM(COALESCE(a.buy_count, 0) >= 2) AS repeat_buyers,
+               COUNT(*) AS n
         FROM run_wallet_activity a
         JOIN run_wallet_cohorts c
           ON a.run_id = c.run_id AND a.address = c.address
+        GROUP BY a.run_id, cohort
         """
     ).fetchall()
-    by_run: Dict[str, Dict[str, List[bool]]] = {}
-    for run_id, eligible, buy_count in rows:
-        key = "eligible" if int(eligible) == 1 else "control"
-        by_run.setdefault(run_id, {"eligible": [], "control": []})
-        by_run[run_id][key].append(int(buy_count or 0) >= 2)
-
-    rates = {}
-    for run_id, buckets in by_run.items():
-        rates[run_id] = {}
-        for key in ["eligible", "control"]:
-            vals = buckets.get(key, [])
-            n = len(vals)
-            rate = (sum(1 for v in vals if v) / n) if n else 0.0
-            rates[run_id][f"{key}_rate"] = rate
-            rates[run_id][f"{key}_n"] = n
+
+    rates: Dict[str, dict] = {}
+    for run_id, key, repeat_buyers, n in rows:
+        r = rates.setdefault(
+            run_id,
+            {"eligible_rate": 0.0, "eligible_n": 0, "control_rate": 0.0, "control_n": 0},
+        )
+        r[f"{key}_rate"] = (int(repeat_buyers) / n) if n else 0.0
+        r[f"{key}_n"] = int(n)
     return rates
 
 
@@ -880,15 +900,6 @@ def _load_cohort_run_data(conn: sqlite3.Connection, run_id: str) -> Optional[Coh
     )
 
 
-def _load_cohort_analytics(conn: sqlite3.Connection, run_ids: List[str]) -> Dict[str, CohortRunData]:
-    out: Dict[str, CohortRunData] = {}
-    for run_id in run_ids:
-        data = _load_cohort_run_data(conn, run_id)
-        if data is not None:
-            out[run_id] = data
-    return out
-
-
 def _plot_repeat_buy_rate_rolling7(outdir: Path, cohort_data: Dict[str, CohortRunData], window: int = 7) -> Optional[Path]:
     ok, plt, plt_close = _get_matplotlib()
     if not ok or not cohort_data:
@@ -933,7 +944,7 @@ def _plot_repeat_buy_rate_rolling7(outdir: Path, cohort_data: Dict[str, CohortRu
     ax.legend()
     out = outdir / "cohort_repeat_buy_rate_rolling7.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -981,7 +992,7 @@ def _plot_retention_curve(outdir: Path, cohort_data: Dict[str, CohortRunData]) -
     ax.legend()
     out = outdir / "cohort_retention_curve.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1079,7 +1090,7 @@ def _plot_buy_intensity_distributions(outdir: Path, cohort_data: Dict[str, Cohor
 
     out = outdir / "cohort_buy_intensity_distributions.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1121,7 +1132,7 @@ def _plot_net_flow_median_by_cohort(outdir: Path, cohort_data: Dict[str, CohortR
     ax.legend()
     out = outdir / "cohort_net_flow_median_timeseries.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1167,7 +1178,7 @@ def _plot_median_holdings_bar(outdir: Path, cohort_data: Dict[str, CohortRunData
     ax.grid(True, axis="y", linestyle="--", alpha=0.4)
     out = outdir / "cohort_median_token_held_bar.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1204,7 +1215,7 @@ def _plot_median_holdings_timeseries(outdir: Path, cohort_data: Dict[str, Cohort
     ax.legend()
     out = outdir / "cohort_median_token_held_timeseries.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1245,7 +1256,7 @@ def _plot_avg_holdings_prepost_control(outdir: Path, cohort_data: Dict[str, Coho
     ax.legend()
     out = outdir / "cohort_avg_token_held_prepost_control.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1320,7 +1331,7 @@ def _plot_threshold_event_window(outdir: Path, cohort_data: Dict[str, CohortRunD
     ax.legend()
     out = outdir / "cohort_threshold_event_window.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1329,31 +1340,126 @@ def _merge_daily_series(
     series_by_run: Dict[str, List[dict]],
     value_key: str,
     drop_last_day: bool = False,
-) -> List[dict]:
+) -> Tuple[List[int], List]:
     """
     Concatenate per-run daily series into a single global timeline.
+    Returns parallel (days, values) columns, ready to hand to matplotlib.
     """
-    merged: List[dict] = []
+    days: List[int] = []
+    values: List = []
     offset = 0
-    for run_id, rows in series_by_run.items():
+    for rows in series_by_run.values():
         if rows and drop_last_day:
             rows = rows[:-1]
-        for r in rows:
-            merged.append({"day": int(r["day"]) + offset, value_key: r[value_key]})
+        days.extend(int(r["day"]) + offset for r in rows)
+        values.extend(r[value_key] for r in rows)
         if rows:
             offset += int(rows[-1]["day"]) + 1
-    return merged
+    return days, values
+
+
+def _rolling_std(values: List[float], window: int) -> List[float]:
+    """
+    Population std over a trailing window, 0.0 until the window is full.
 
+    Keeps running sum / sum of squares so each step is O(1) instead of
+    re-scanning the window.
+    """
+    out: List[float] = []
+    s1 = 0.0
+    s2 = 0.0
+    for i, x in enumerate(values):
+        s1 += x
+        s2 += x * x
+        if i >= window:
+            old = values[i - window]
+            s1 -= old
+            s2 -= old * old
+        if i + 1 < window:
+            out.append(0.0)
+            continue
+        mean = s1 / window
+        var = s2 / window - mean * mean
+        out.append(var**0.5 if var > 0.0 else 0.0)
+    return out
 
+
+def _lttb(xs, ys, n_out: int = 3000):
+    """
+    Largest-Triangle-Three-Buckets downsampling for dense line plots.
+
+    A 10x6in figure at 150 dpi is ~1500px wide, so anything past a few
+    thousand points is pure overdraw. Keeps the first/last points and, per
+    bucket, the point forming the largest triangle with the previous pick and
+    the next bucket's centroid. Only called from plot code, so NumPy is here.
+    """
+    import numpy as np  # ships with matplotlib
+
+    xs = np.asarray(xs)
+    ys = np.asarray(ys)
+    n = xs.shape[0]
+    if n_out < 3 or n <= n_out:
+        return xs, ys
+    x = xs.astype(np.float64)
+    y = ys.astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    edges = np.append(edges, n)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi, nxt = edges[i], edges[i + 1], edges[i + 2]
+        cx = x[hi:nxt].mean()
+        cy = y[hi:nxt].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+    return xs[idx], ys[idx]
+
+
+# Fast zlib level for plot PNGs: encoding dominates savefig on dense plots and
+# level 1 costs only a modestly larger file.
+_PNG_SAVE_KWARGS = {"compress_level": 1, "optimize": False}
+
+
+def _hist_bars(ax, values, bins: int = 30, **style) -> bool:
+    """
+    Histogram drawn from precomputed counts: bin once with np.histogram and
+    draw a single filled step patch rather than one Rectangle per bin.
+
+    NaN/inf values are dropped (np.histogram rejects them); returns False
+    without drawing if no finite values remain.
+    """
+    import numpy as np  # ships with matplotlib
+
+    v = np.asarray(values, dtype=np.float64)
+    v = v[np.isfinite(v)]
+    if v.size == 0:
+        return False
+    counts, edges = np.histogram(v, bins=bins)
+    ax.stairs(counts, edges, fill=True, **style)
+    return True
+
+
+@lru_cache(maxsize=None)
 def _get_matplotlib() -> Tuple[bool, Optional[object], Optional[object]]:
     """
     Lazy import matplotlib so environments without it can still generate text summaries.
     Returns (available, plt, plt_close_fn)
+
+    Cached, so backend/rcParams setup (and the "unavailable" notice) happens
+    once per process rather than once per plot.
     """
     try:
+        os.environ.setdefault("MPLBACKEND", "Agg")
         import matplotlib
 
         matplotlib.use("Agg")
+        # Let Agg drop sub-pixel vertices and render long paths in chunks.
+        matplotlib.rcParams["path.simplify"] = True
+        matplotlib.rcParams["path.simplify_threshold"] = 1.0
+        matplotlib.rcParams["agg.path.chunksize"] = 10000
         import matplotlib.pyplot as plt
     except Exception as exc:  # noqa: BLE001
         print(f"  matplotlib unavailable; skipping plots ({exc})")
@@ -1365,10 +1471,10 @@ def _plot_price_paths(outdir: Path, daily_prices_by_run: Dict[str, List[dict]])
     ok, plt, plt_close = _get_matplotlib()
     if not ok or not daily_prices_by_run:
         return None
+    days, norm_prices = _merge_daily_series(daily_prices_by_run, "avg_normalized_price")
+    # Many concatenated runs can exceed the figure's pixel width.
+    days, norm_prices = _lttb(days, norm_prices)
     fig, ax = plt.subplots(figsize=(10, 6))
-    merged = _merge_daily_series(daily_prices_by_run, "avg_normalized_price")
-    days = [r["day"] for r in merged]
-    norm_prices = [r["avg_normalized_price"] for r in merged]
     ax.plot(days, norm_prices, marker="o", label="all runs")
     ax.set_title("Normalized price path (all runs)")
     ax.set_xlabel("Day (sim)")
@@ -1376,7 +1482,7 @@ def _plot_price_paths(outdir: Path, daily_prices_by_run: Dict[str, List[dict]])
     ax.grid(True, linestyle="--", alpha=0.4)
     out = outdir / "price_paths.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1387,13 +1493,9 @@ def _plot_volume_and_swaps(outdir: Path, daily_market_by_run: Dict[str, List[dic
         return None
     fig, ax1 = plt.subplots(figsize=(10, 6))
     ax2 = ax1.twinx()
-    merged_weth_in = _merge_daily_series(daily_market_by_run, "volume_weth_in", drop_last_day=True)
-    merged_weth_total = _merge_daily_series(daily_market_by_run, "volume_weth_total", drop_last_day=True)
-    merged_swaps = _merge_daily_series(daily_market_by_run, "swap_count", drop_last_day=True)
-    days = [r["day"] for r in merged_weth_in]
-    vols_in = [r["volume_weth_in"] for r in merged_weth_in]
-    vols_total = [r["volume_weth_total"] for r in merged_weth_total] if merged_weth_total else vols_in
-    swaps = [r["swap_count"] for r in merged_swaps]
+    days, vols_in = _merge_daily_series(daily_market_by_run, "volume_weth_in", drop_last_day=True)
+    _, vols_total = _merge_daily_series(daily_market_by_run, "volume_weth_total", drop_last_day=True)
+    _, swaps = _merge_daily_series(daily_market_by_run, "swap_count", drop_last_day=True)
     ax1.plot(days, vols_in, marker="o", label="buy-side WETH in (weth_in)")
     ax1.plot(days, vols_total, marker=".", linestyle="--", label="gross WETH volume (weth_total)")
     ax2.plot(days, swaps, marker="s", linestyle="--", label="swaps")
@@ -1405,7 +1507,7 @@ def _plot_volume_and_swaps(outdir: Path, daily_market_by_run: Dict[str, List[dic
     ax1.legend(loc="upper left")
     out = outdir / "volume_and_swaps.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1415,11 +1517,8 @@ def _plot_market_volume(outdir: Path, daily_market_by_run: Dict[str, List[dict]]
     if not ok or not daily_market_by_run:
         return None
     fig, ax = plt.subplots(figsize=(10, 6))
-    merged_in = _merge_daily_series(daily_market_by_run, "volume_weth_in", drop_last_day=True)
-    merged_total = _merge_daily_series(daily_market_by_run, "volume_weth_total", drop_last_day=True)
-    days = [r["day"] for r in merged_in]
-    vols_in = [r["volume_weth_in"] for r in merged_in]
-    vols_total = [r["volume_weth_total"] for r in merged_total] if merged_total else vols_in
+    days, vols_in = _merge_daily_series(daily_market_by_run, "volume_weth_in", drop_last_day=True)
+    _, vols_total = _merge_daily_series(daily_market_by_run, "volume_weth_total", drop_last_day=True)
     ax.plot(days, vols_in, marker="s", label="buy-side WETH in (weth_in)")
     ax.plot(days, vols_total, marker=".", linestyle="--", label="gross WETH volume (weth_total)")
     ax.set_title("Daily WETH volume (buy-side vs gross) (all runs)")
@@ -1429,7 +1528,7 @@ def _plot_market_volume(outdir: Path, daily_market_by_run: Dict[str, List[dict]]
     ax.legend()
     out = outdir / "volume_weth_in.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1443,28 +1542,16 @@ def _plot_rolling_vol_vs_volume(
     ok, plt, plt_close = _get_matplotlib()
     if not ok:
         return None
+    days, returns = _merge_daily_series(daily_returns_by_run, "return")
+    if not days:
+        return None
     fig, ax1 = plt.subplots(figsize=(10, 6))
     ax2 = ax1.twinx()
-    merged_returns = _merge_daily_series(daily_returns_by_run, "return")
-    if not merged_returns:
-        return None
-    days = [r["day"] for r in merged_returns]
-    returns = [r["return"] for r in merged_returns]
-    rolling = []
-    for i in range(len(returns)):
-        if i + 1 < window:
-            rolling.append(0.0)
-            continue
-        win = returns[i + 1 - window : i + 1]
-        mean = sum(win) / len(win)
-        var = sum((x - mean) ** 2 for x in win) / len(win)
-        rolling.append(var**0.5)
+    rolling = _rolling_std(returns, window)
     ax1.plot(days, rolling, label="vol")
 
-    merged_vols = _merge_daily_series(daily_market_by_run, "volume_weth_total", drop_last_day=True)
-    if merged_vols:
-        vol_days = [r["day"] for r in merged_vols]
-        vol = [r["volume_weth_total"] for r in merged_vols]
+    vol_days, vol = _merge_daily_series(daily_market_by_run, "volume_weth_total", drop_last_day=True)
+    if vol_days:
         ax2.plot(vol_days, vol, linestyle="--", label="gross WETH volume")
     ax1.set_title(f"Rolling volatility (window={window}) vs daily volume (all runs)")
     ax1.set_xlabel("Day (sim)")
@@ -1473,7 +1560,7 @@ def _plot_rolling_vol_vs_volume(
     ax1.grid(True, linestyle="--", alpha=0.4)
     out = outdir / "rolling_vol_vs_volume.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1484,21 +1571,31 @@ def _plot_return_distributions(outdir: Path, daily_returns_by_run: Dict[str, Lis
         return None
     all_returns = []
     for rows in daily_returns_by_run.values():
-        all_returns.extend([r["return"] for r in rows])
+        all_returns.extend([r["return"] for r in rows if math.isfinite(r["return"])])
     if not all_returns:
         return None
     fig, axes = plt.subplots(1, 2, figsize=(12, 5))
-    axes[0].hist(all_returns, bins=30, color="#607d8b", alpha=0.8)
+    _hist_bars(axes[0], all_returns, bins=30, color="#607d8b", alpha=0.8)
     axes[0].set_title("Daily return histogram (all runs)")
     axes[0].set_xlabel("Return")
     axes[0].set_ylabel("Frequency")
     axes[0].grid(True, linestyle="--", alpha=0.4)
 
-    sorted_rets = sorted(abs(r) for r in all_returns if r is not None)
-    n = len(sorted_rets)
+    import numpy as np  # ships with matplotlib
+
+    xs = np.abs(np.asarray(all_returns, dtype=np.float64))
+    xs.sort()
+    n = xs.size
     if n > 0:
-        xs = sorted_rets
-        ys = [1.0 - (i + 1) / n for i in range(n)]
+        # Drop the last point: its CCDF is 0, which a log axis cannot draw.
+        xs = xs[:-1]
+        ys = 1.0 - np.arange(1, n) / n
+        m = xs.size
+        if m > 4000:
+            # Space picks geometrically in distance from the largest value so the
+            # tail (small P) stays dense on log-log axes.
+            idx = (m - 1) - (np.unique(np.geomspace(1, m, 4000).astype(np.int64)) - 1)[::-1]
+            xs, ys = xs[idx], ys[idx]
         axes[1].plot(xs, ys, color="#ff7043")
         axes[1].set_yscale("log")
         axes[1].set_xscale("log")
@@ -1509,7 +1606,7 @@ def _plot_return_distributions(outdir: Path, daily_returns_by_run: Dict[str, Lis
 
     out = outdir / "return_distributions.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1523,14 +1620,12 @@ def _plot_trade_size_distributions(outdir: Path, trade_sizes: Dict[str, List[flo
     if not buys and not sells:
         return None
     fig, axes = plt.subplots(1, 2, figsize=(12, 5))
-    if buys:
-        axes[0].hist(buys, bins=30, color="#4caf50", alpha=0.8)
+    if buys and _hist_bars(axes[0], buys, bins=30, color="#4caf50", alpha=0.8):
         axes[0].set_title("BUY size histogram (TOKEN)")
         axes[0].set_xlabel("Size")
     else:
         axes[0].set_title("BUY size histogram (TOKEN) - no data")
-    if sells:
-        axes[1].hist(sells, bins=30, color="#f44336", alpha=0.8)
+    if sells and _hist_bars(axes[1], sells, bins=30, color="#f44336", alpha=0.8):
         axes[1].set_title("SELL size histogram (TOKEN)")
         axes[1].set_xlabel("Size")
     else:
@@ -1540,11 +1635,34 @@ def _plot_trade_size_distributions(outdir: Path, trade_sizes: Dict[str, List[flo
         ax.grid(True, linestyle="--", alpha=0.4)
     out = outdir / "trade_size_hist.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
 
+def _align_price_fair(
+    daily_prices_by_run: Dict[str, List[dict]],
+    fair_values_by_run: Dict[str, List[dict]],
+) -> Tuple[List[int], List[float], List[float]]:
+    """
+    Merge prices and fair values onto the global timeline, keeping only days
+    present in both. Returns (days, prices, fairs).
+    """
+    price_days, prices = _merge_daily_series(daily_prices_by_run, "avg_normalized_price")
+    fair_days, fair_vals = _merge_daily_series(fair_values_by_run, "fair_value")
+    fairs_map = dict(zip(fair_days, fair_vals))
+    days: List[int] = []
+    kept_prices: List[float] = []
+    fairs: List[float] = []
+    for d, p in zip(price_days, prices):
+        if d not in fairs_map:
+            continue
+        days.append(d)
+        kept_prices.append(p)
+        fairs.append(fairs_map[d])
+    return days, kept_prices, fairs
+
+
 def _plot_price_vs_fair_value(
     outdir: Path,
     daily_prices_by_run: Dict[str, List[dict]],
@@ -1553,15 +1671,10 @@ def _plot_price_vs_fair_value(
     ok, plt, plt_close = _get_matplotlib()
     if not ok:
         return None
-    fig, ax = plt.subplots(figsize=(10, 6))
-    merged_prices = _merge_daily_series(daily_prices_by_run, "avg_normalized_price")
-    merged_fairs = _merge_daily_series(fair_values_by_run, "fair_value")
-    if not merged_prices or not merged_fairs:
+    days, prices, fairs = _align_price_fair(daily_prices_by_run, fair_values_by_run)
+    if not days:
         return None
-    fairs_map = {r["day"]: r["fair_value"] for r in merged_fairs}
-    days = [r["day"] for r in merged_prices if r["day"] in fairs_map]
-    prices = [r["avg_normalized_price"] for r in merged_prices if r["day"] in fairs_map]
-    fairs = [fairs_map.get(d, None) for d in days]
+    fig, ax = plt.subplots(figsize=(10, 6))
     ax.plot(days, prices, label="price")
     ax.plot(days, fairs, linestyle="--", label="fair")
     ax.set_title("Normalized price vs latent fair value (all runs)")
@@ -1571,7 +1684,7 @@ def _plot_price_vs_fair_value(
     ax.legend()
     out = outdir / "price_vs_fair_value.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1584,19 +1697,14 @@ def _plot_price_fair_spread(
     ok, plt, plt_close = _get_matplotlib()
     if not ok:
         return None
-    fig, ax = plt.subplots(figsize=(10, 6))
-    merged_prices = _merge_daily_series(daily_prices_by_run, "avg_normalized_price")
-    merged_fairs = _merge_daily_series(fair_values_by_run, "fair_value")
-    if not merged_prices or not merged_fairs:
+    days, prices, fairs = _align_price_fair(daily_prices_by_run, fair_values_by_run)
+    if not days:
         return None
-    fairs_map = {r["day"]: r["fair_value"] for r in merged_fairs}
-    days = [r["day"] for r in merged_prices if r["day"] in fairs_map]
-    spread = []
-    for r in merged_prices:
-        if r["day"] not in fairs_map:
-            continue
-        fv = fairs_map.get(r["day"])
-        spread.append(r["avg_normalized_price"] - fv if fv is not None else 0.0)
+    import numpy as np  # ships with matplotlib
+
+    # Aligned days always carry a fair value, so the spread is one vector op.
+    spread = np.subtract(prices, fairs, dtype=np.float64)
+    fig, ax = plt.subplots(figsize=(10, 6))
     ax.plot(days, spread, label="all runs")
     ax.set_title("Price - fair value spread (normalized) (all runs)")
     ax.set_xlabel("Day (sim)")
@@ -1604,7 +1712,7 @@ def _plot_price_fair_spread(
     ax.grid(True, linestyle="--", alpha=0.4)
     out = outdir / "price_fair_spread.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1617,15 +1725,11 @@ def _plot_price_fair_log(
     ok, plt, plt_close = _get_matplotlib()
     if not ok:
         return None
-    merged_prices = _merge_daily_series(daily_prices_by_run, "avg_normalized_price")
-    merged_fairs = _merge_daily_series(fair_values_by_run, "fair_value")
-    if not merged_prices or not merged_fairs:
+    days, prices, fairs = _align_price_fair(daily_prices_by_run, fair_values_by_run)
+    if not days:
         return None
-
-    fairs_map = {r["day"]: r["fair_value"] for r in merged_fairs}
-    days = [r["day"] for r in merged_prices if r["day"] in fairs_map]
-    prices_log = [math.log(max(r["avg_normalized_price"], 1e-12)) for r in merged_prices if r["day"] in fairs_map]
-    fairs_log = [math.log(max(fairs_map.get(d, 1e-12), 1e-12)) for d in days]
+    prices_log = [math.log(max(p, 1e-12)) for p in prices]
+    fairs_log = [math.log(max(fv, 1e-12)) for fv in fairs]
 
     fig, ax = plt.subplots(figsize=(10, 6))
     ax.plot(days, fairs_log, label="fair value (log)")
@@ -1637,7 +1741,7 @@ def _plot_price_fair_log(
     ax.legend()
     out = outdir / "price_fair_log.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1646,16 +1750,11 @@ def _plot_regime_trace(outdir: Path, regime_by_run: Dict[str, List[dict]]) -> Op
     ok, plt, plt_close = _get_matplotlib()
     if not ok or not regime_by_run:
         return None
-    merged_regime = _merge_daily_series(regime_by_run, "regime_code")
-    merged_sent = _merge_daily_series(regime_by_run, "sentiment")
-    if not merged_regime:
+    days, codes = _merge_daily_series(regime_by_run, "regime_code")
+    sent_days, sentiments = _merge_daily_series(regime_by_run, "sentiment")
+    if not days:
         return None
 
-    days = [r["day"] for r in merged_regime]
-    codes = [r["regime_code"] for r in merged_regime]
-    sent_days = [r["day"] for r in merged_sent]
-    sentiments = [r["sentiment"] for r in merged_sent]
-
     fig, ax1 = plt.subplots(figsize=(10, 4.8))
     ax2 = ax1.twinx()
 
@@ -1674,25 +1773,17 @@ def _plot_regime_trace(outdir: Path, regime_by_run: Dict[str, List[dict]]) -> Op
 
     out = outdir / "regime_trace.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
 
-def _plot_holder_counts(outdir: Path, balances_by_run: Dict[str, Dict[int, List[int]]]) -> Optional[Path]:
+def _plot_holder_counts(outdir: Path, series: Tuple[List[int], List]) -> Optional[Path]:
     ok, plt, plt_close = _get_matplotlib()
-    if not ok:
+    days, holders = series
+    if not ok or not days:
         return None
     fig, ax = plt.subplots(figsize=(10, 6))
-    merged = _merge_daily_series(
-        {rid: [{"day": d, "holders": sum(1 for b in bals if b > 0)} for d, bals in sorted(day_map.items())]
-         for rid, day_map in balances_by_run.items()},
-        "holders",
-    )
-    if not merged:
-        return None
-    days = [r["day"] for r in merged]
-    holders = [r["holders"] for r in merged]
     ax.plot(days, holders, label="all runs")
     ax.set_title("Holder count over time (all runs)")
     ax.set_xlabel("Day (sim)")
@@ -1700,26 +1791,17 @@ def _plot_holder_counts(outdir: Path, balances_by_run: Dict[str, Dict[int, List[
     ax.grid(True, linestyle="--", alpha=0.4)
     out = outdir / "holder_count.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
 
-def _plot_balance_concentration(outdir: Path, balances_by_run: Dict[str, Dict[int, List[int]]]) -> Optional[Path]:
+def _plot_balance_concentration(outdir: Path, series: Tuple[List[int], List]) -> Optional[Path]:
     ok, plt, plt_close = _get_matplotlib()
-    if not ok:
+    days, top10 = series
+    if not ok or not days:
         return None
     fig, ax = plt.subplots(figsize=(10, 6))
-    merged = _merge_daily_series(
-        {rid: [{"day": d, "top10": (sum(sorted([b for b in bals if b > 0], reverse=True)[:10]) / sum(b for b in bals if b > 0)) if sum(b for b in bals if b > 0) > 0 else 0.0}
-              for d, bals in sorted(day_map.items())]
-         for rid, day_map in balances_by_run.items()},
-        "top10",
-    )
-    if not merged:
-        return None
-    days = [r["day"] for r in merged]
-    top10 = [r["top10"] for r in merged]
     ax.plot(days, top10, label="all runs")
     ax.set_title("Top-10 balance concentration over time (all runs)")
     ax.set_xlabel("Day (sim)")
@@ -1727,63 +1809,66 @@ def _plot_balance_concentration(outdir: Path, balances_by_run: Dict[str, Dict[in
     ax.grid(True, linestyle="--", alpha=0.4)
     out = outdir / "top10_concentration.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
 
-def _plot_tick_price_scatter(outdir: Path, ticks_prices_by_run: Dict[str, List[tuple]]) -> Optional[Path]:
+def _plot_tick_price_scatter(
+    outdir: Path,
+    ticks_prices_by_run: Dict[str, Tuple[List[float], List[float]]],
+) -> Optional[Path]:
     ok, plt, plt_close = _get_matplotlib()
     if not ok:
         return None
-    fig, ax = plt.subplots(figsize=(10, 6))
-    all_rows = []
-    for run_id, rows in sorted(ticks_prices_by_run.items()):
-        all_rows.extend(rows)
-    if not all_rows:
+    import numpy as np  # ships with matplotlib
+
+    cols = [cols for _, cols in sorted(ticks_prices_by_run.items()) if cols[0]]
+    if not cols:
         return None
-    ticks = [float(t) for t, _ in all_rows]
-    prices = [float(p) for _, p in all_rows]
-    ax.scatter(ticks, prices, s=10, alpha=0.5)
+    ticks = np.concatenate([np.asarray(t, dtype=np.float64) for t, _ in cols])
+    prices = np.concatenate([np.asarray(p, dtype=np.float64) for _, p in cols])
+    fig, ax = plt.subplots(figsize=(10, 6))
+    # One Line2D with markers draws far faster than a per-point PathCollection.
+    ax.plot(ticks, prices, linestyle="none", marker="o", markersize=3, alpha=0.5, rasterized=True)
     ax.set_title("Normalized price vs tick (all runs)")
     ax.set_xlabel("Tick")
     ax.set_ylabel("Normalized price")
     ax.grid(True, linestyle="--", alpha=0.4)
     out = outdir / "price_vs_tick.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=100, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
 
-def _plot_liquidity_over_time(outdir: Path, liquidity_by_run: Dict[str, List[tuple]]) -> Optional[Path]:
+def _plot_liquidity_over_time(
+    outdir: Path,
+    liquidity_by_run: Dict[str, Tuple[List[int], List[float]]],
+) -> Optional[Path]:
     ok, plt, plt_close = _get_matplotlib()
     if not ok:
         return None
-    fig, ax = plt.subplots(figsize=(10, 6))
-    all_rows = []
-    for run_id, rows in sorted(liquidity_by_run.items()):
-        all_rows.extend(rows)
-    if not all_rows:
+    import numpy as np  # ships with matplotlib
+
+    cols = [cols for _, cols in sorted(liquidity_by_run.items()) if cols[0]]
+    if not cols:
         return None
-    blocks = [int(b) for b, _, _ in all_rows]
-    liqs = []
-    for _, lq, _ in all_rows:
-        try:
-            liqs.append(float(lq))
-        except Exception:
-            liqs.append(0.0)
-    if liqs and max(liqs) == min(liqs):
+    blocks = np.concatenate([np.asarray(b, dtype=np.int64) for b, _ in cols])
+    liqs = np.concatenate([np.asarray(lq, dtype=np.float64) for _, lq in cols])
+    if liqs.max() == liqs.min():
         # No mint/burns; liquidity is constant.
         return None
-    ax.plot(blocks, liqs)
+    blocks, liqs = _lttb(blocks, liqs)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(blocks, liqs, rasterized=True)
     ax.set_title("Pool liquidity over time (raw)")
     ax.set_xlabel("Block")
     ax.set_ylabel("Liquidity")
     ax.grid(True, linestyle="--", alpha=0.4)
     out = outdir / "liquidity_over_time.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1830,7 +1915,7 @@ def _plot_repeat_buy_rates(outdir: Path, cohort_data: Dict[str, CohortRunData])
     ax.grid(True, axis="y", linestyle="--", alpha=0.4)
     out = outdir / "repeat_buy_rates.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1867,7 +1952,7 @@ def _plot_trade_outcomes(outdir: Path, summaries: Dict[str, dict]) -> Optional[P
 
     fig.tight_layout()
     out = outdir / "trade_and_mint_outcomes.png"
-    fig.savefig(out, dpi=150)
+    fig.savefig(out, dpi=150, pil_kwargs=_PNG_SAVE_KWARGS)
     plt_close(fig)
     return out
 
@@ -1972,6 +2057,63 @@ def _write_summary(outdir: Path, runs: Dict[str, RunMeta], summaries: Dict[str,
     return out
 
 
+def _load_parallel(warehouse: Path, tasks: Dict[object, Callable[[sqlite3.Connection], object]]) -> Dict[object, object]:
+    """
+    Run independent loaders on a thread pool, one read-only connection per thread.
+
+    sqlite3 releases the GIL while a statement steps, so the per-table scans
+    overlap instead of queueing behind each other on a single connection.
+    """
+    local = threading.local()
+    conns: List[sqlite3.Connection] = []
+
+    def run(load: Callable[[sqlite3.Connection], object]) -> object:
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = _connect(warehouse)
+            conns.append(conn)
+        return load(conn)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(tasks)))) as pool:
+            futures = {key: pool.submit(run, load) for key, load in tasks.items()}
+            return {key: f.result() for key, f in futures.items()}
+    finally:
+        for conn in conns:
+            conn.close()
+
+
+def _has_data(value) -> bool:
+    """
+    True if any series inside a loader result (dict / column tuple / list) is non-empty.
+    """
+    if isinstance(value, dict):
+        return any(_has_data(v) for v in value.values())
+    if isinstance(value, tuple):
+        return any(_has_data(v) for v in value)
+    if isinstance(value, list):
+        return bool(value)
+    return True
+
+
+def _render_plots(jobs: List[partial]) -> List[Optional[Path]]:
+    """
+    Run independent plot jobs across processes and return their paths in job order.
+
+    Each _plot_* builds its own figure and writes its own file from read-only
+    inputs, so savefig/PNG encoding parallelizes cleanly.
+    """
+    ok, _, _ = _get_matplotlib()
+    if not ok:
+        return [None] * len(jobs)
+    workers = min(8, os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return [job() for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(job) for job in jobs]
+        return [f.result() for f in futures]
+
+
 def generate_report(warehouse: Path, outdir: Path, run_filter: Optional[List[str]]) -> None:
     outdir.mkdir(parents=True, exist_ok=True)
     conn = _connect(warehouse)
@@ -1981,138 +2123,94 @@ def generate_report(warehouse: Path, outdir: Path, run_filter: Optional[List[str
         if not runs:
             raise RuntimeError("No runs found in warehouse. Append runs first.")
 
-        run_ids = _load_run_ids_ordered(conn)
-        if run_filter:
-            run_ids = [r for r in run_ids if r in set(run_filter)]
-
         if run_filter:
-            runs = {rid: meta for rid, meta in runs.items() if rid in set(run_filter)}
+            wanted = set(run_filter)
+            runs = {rid: meta for rid, meta in runs.items() if rid in wanted}
             if not runs:
                 raise RuntimeError("No matching runs after applying --runs filter.")
-
-        summaries = {}
-        for run_id in run_ids:
-            summary = _load_run_summary(conn, run_id)
-            if summary:
-                summaries[run_id] = summary
-
-        daily_prices = {rid: _load_daily_prices(conn, rid) for rid in run_ids}
-        daily_close_prices = {rid: _load_daily_close_prices(conn, rid) for rid in run_ids}
-        daily_market = {rid: _load_daily_market(conn, rid) for rid in run_ids}
-        daily_returns = {rid: _load_daily_returns(conn, rid) for rid in run_ids}
-        trade_sizes = _load_trade_sizes(conn)
-        fair_values = {rid: _load_fair_values(conn, rid) for rid in run_ids}
-        regime_trace = {rid: _load_regime_trace(conn, rid) for rid in run_ids}
-        balances = {rid: _load_wallet_balances(conn, rid) for rid in run_ids}
-        ticks_prices = {rid: _load_swap_ticks_prices(conn, rid) for rid in run_ids}
-        liquidity_series = {rid: _load_liquidity_series(conn, rid) for rid in run_ids}
-        cohort_analytics = _load_cohort_analytics(conn, run_ids)
+        # _load_runs is already ordered by created_at_utc.
+        run_ids = list(runs)
     finally:
         conn.close()
 
-    print(f"Report output: {outdir}")
-
-    price_plot = _plot_price_paths(outdir, daily_close_prices)
-    if price_plot:
-        print(f"  wrote {price_plot}")
-    else:
-        print("  skipped price plot (no data)")
-
-    volume_plot = _plot_market_volume(outdir, daily_market)
-    if volume_plot:
-        print(f"  wrote {volume_plot}")
-    else:
-        print("  skipped volume plot (no data)")
-
-    price_fair_plot = _plot_price_vs_fair_value(outdir, daily_close_prices, fair_values)
-    if price_fair_plot:
-        print(f"  wrote {price_fair_plot}")
-
-    spread_plot = _plot_price_fair_spread(outdir, daily_close_prices, fair_values)
-    if spread_plot:
-        print(f"  wrote {spread_plot}")
-
-    fair_log_plot = _plot_price_fair_log(outdir, daily_close_prices, fair_values)
-    if fair_log_plot:
-        print(f"  wrote {fair_log_plot}")
-
-    regime_plot = _plot_regime_trace(outdir, regime_trace)
-    if regime_plot:
-        print(f"  wrote {regime_plot}")
-
-    volume_swaps_plot = _plot_volume_and_swaps(outdir, daily_market)
-    if volume_swaps_plot:
-        print(f"  wrote {volume_swaps_plot}")
-
-    roll_vol_plot = _plot_rolling_vol_vs_volume(outdir, daily_market, daily_returns, window=5)
-    if roll_vol_plot:
-        print(f"  wrote {roll_vol_plot}")
-
-    return_dist_plot = _plot_return_distributions(outdir, daily_returns)
-    if return_dist_plot:
-        print(f"  wrote {return_dist_plot}")
-
-    trade_size_plot = _plot_trade_size_distributions(outdir, trade_sizes)
-    if trade_size_plot:
-        print(f"  wrote {trade_size_plot}")
-
-    holder_plot = _plot_holder_counts(outdir, balances)
-    if holder_plot:
-        print(f"  wrote {holder_plot}")
-
-    concentration_plot = _plot_balance_concentration(outdir, balances)
-    if concentration_plot:
-        print(f"  wrote {concentration_plot}")
-
-    tick_price_plot = _plot_tick_price_scatter(outdir, ticks_prices)
-    if tick_price_plot:
-        print(f"  wrote {tick_price_plot}")
-
-    liq_plot = _plot_liquidity_over_time(outdir, liquidity_series)
-    if liq_plot:
-        print(f"  wrote {liq_plot}")
-
-    repeat_buy_plot = _plot_repeat_buy_rates(outdir, cohort_analytics)
-    if repeat_buy_plot:
-        print(f"  wrote {repeat_buy_plot}")
-
-    cohort_repeat_roll = _plot_repeat_buy_rate_rolling7(outdir, cohort_analytics, window=7)
-    if cohort_repeat_roll:
-        print(f"  wrote {cohort_repeat_roll}")
-
-    cohort_retention = _plot_retention_curve(outdir, cohort_analytics)
-    if cohort_retention:
-        print(f"  wrote {cohort_retention}")
-
-    cohort_intensity = _plot_buy_intensity_distributions(outdir, cohort_analytics)
-    if cohort_intensity:
-        print(f"  wrote {cohort_intensity}")
-
-    cohort_net_flow = _plot_net_flow_median_by_cohort(outdir, cohort_analytics)
-    if cohort_net_flow:
-        print(f"  wrote {cohort_net_flow}")
-
-    cohort_median_bar = _plot_median_holdings_bar(outdir, cohort_analytics)
-    if cohort_median_bar:
-        print(f"  wrote {cohort_median_bar}")
-
-    cohort_median_ts = _plot_median_holdings_timeseries(outdir, cohort_analytics)
-    if cohort_median_ts:
-        print(f"  wrote {cohort_median_ts}")
-
-    cohort_avg_prepost = _plot_avg_holdings_prepost_control(outdir, cohort_analytics)
-    if cohort_avg_prepost:
-        print(f"  wrote {cohort_avg_prepost}")
+    # Close prices and cohort data depend on per-run stats, so they fan out
+    # one task per run; everything else is one query across all runs.
+    per_run_loaders = {
+        "daily_close_prices": _load_daily_close_prices,
+        "cohort": _load_cohort_run_data,
+    }
+    tasks: Dict[object, Callable[[sqlite3.Connection], object]] = {
+        (name, rid): partial(loader, run_id=rid)
+        for name, loader in per_run_loaders.items()
+        for rid in run_ids
+    }
+    tasks.update(
+        {
+            "summaries": partial(_load_run_summaries, run_ids=run_ids),
+            "daily_market": partial(_load_daily_market, run_ids=run_ids),
+            "trade_sizes": _load_trade_sizes,
+            "fair_values": partial(_load_fair_values, run_ids=run_ids),
+            "regime_trace": partial(_load_regime_trace, run_ids=run_ids),
+            "holder_stats": partial(_load_daily_holder_stats, run_ids=run_ids),
+            "ticks_prices": partial(_load_swap_ticks_prices, run_ids=run_ids),
+            "liquidity_series": partial(_load_liquidity_series, run_ids=run_ids),
+        }
+    )
+    loaded = _load_parallel(warehouse, tasks)
+
+    summaries = loaded["summaries"]
+    daily_close_prices = {rid: loaded[("daily_close_prices", rid)] for rid in run_ids}
+    daily_returns = {rid: _daily_returns_from_closes(closes) for rid, closes in daily_close_prices.items()}
+    cohort_analytics = {rid: loaded[("cohort", rid)] for rid in run_ids if loaded[("cohort", rid)] is not None}
+    daily_market = loaded["daily_market"]
+    trade_sizes = loaded["trade_sizes"]
+    fair_values = loaded["fair_values"]
+    regime_trace = loaded["regime_trace"]
+    holder_stats = loaded["holder_stats"]
+    ticks_prices = loaded["ticks_prices"]
+    liquidity_series = loaded["liquidity_series"]
 
-    cohort_thresh_window = _plot_threshold_event_window(outdir, cohort_analytics, window=14)
-    if cohort_thresh_window:
-        print(f"  wrote {cohort_thresh_window}")
+    print(f"Report output: {outdir}")
 
-    outcomes_plot = _plot_trade_outcomes(outdir, summaries)
-    if outcomes_plot:
-        print(f"  wrote {outcomes_plot}")
-    else:
-        print("  skipped trade outcomes plot (no data)")
+    holders_series = _merge_daily_series(holder_stats, "holders")
+    top10_series = _merge_daily_series(holder_stats, "top10")
+    # (plot job, inputs it needs, message when it produces nothing); rendered
+    # in parallel, reported in this order. Jobs whose inputs are empty are
+    # never shipped to a worker.
+    plot_jobs: List[Tuple[partial, tuple, Optional[str]]] = [
+        (partial(_plot_price_paths, outdir, daily_close_prices), (daily_close_prices,), "skipped price plot (no data)"),
+        (partial(_plot_market_volume, outdir, daily_market), (daily_market,), "skipped volume plot (no data)"),
+        (partial(_plot_price_vs_fair_value, outdir, daily_close_prices, fair_values), (daily_close_prices, fair_values), None),
+        (partial(_plot_price_fair_spread, outdir, daily_close_prices, fair_values), (daily_close_prices, fair_values), None),
+        (partial(_plot_price_fair_log, outdir, daily_close_prices, fair_values), (daily_close_prices, fair_values), None),
+        (partial(_plot_regime_trace, outdir, regime_trace), (regime_trace,), None),
+        (partial(_plot_volume_and_swaps, outdir, daily_market), (daily_market,), None),
+        (partial(_plot_rolling_vol_vs_volume, outdir, daily_market, daily_returns, window=5), (daily_returns,), None),
+        (partial(_plot_return_distributions, outdir, daily_returns), (daily_returns,), None),
+        (partial(_plot_trade_size_distributions, outdir, trade_sizes), (trade_sizes,), None),
+        (partial(_plot_holder_counts, outdir, holders_series), (holders_series,), None),
+        (partial(_plot_balance_concentration, outdir, top10_series), (top10_series,), None),
+        (partial(_plot_tick_price_scatter, outdir, ticks_prices), (ticks_prices,), None),
+        (partial(_plot_liquidity_over_time, outdir, liquidity_series), (liquidity_series,), None),
+        (partial(_plot_repeat_buy_rates, outdir, cohort_analytics), (cohort_analytics,), None),
+        (partial(_plot_repeat_buy_rate_rolling7, outdir, cohort_analytics, window=7), (cohort_analytics,), None),
+        (partial(_plot_retention_curve, outdir, cohort_analytics), (cohort_analytics,), None),
+        (partial(_plot_buy_intensity_distributions, outdir, cohort_analytics), (cohort_analytics,), None),
+        (partial(_plot_net_flow_median_by_cohort, outdir, cohort_analytics), (cohort_analytics,), None),
+        (partial(_plot_median_holdings_bar, outdir, cohort_analytics), (cohort_analytics,), None),
+        (partial(_plot_median_holdings_timeseries, outdir, cohort_analytics), (cohort_analytics,), None),
+        (partial(_plot_avg_holdings_prepost_control, outdir, cohort_analytics), (cohort_analytics,), None),
+        (partial(_plot_threshold_event_window, outdir, cohort_analytics, window=14), (cohort_analytics,), None),
+        (partial(_plot_trade_outcomes, outdir, summaries), (summaries,), "skipped trade outcomes plot (no data)"),
+    ]
+    has_inputs = [all(_has_data(x) for x in inputs) for _, inputs, _ in plot_jobs]
+    rendered = iter(_render_plots([job for (job, _, _), ready in zip(plot_jobs, has_inputs) if ready]))
+    for (_, _, skipped_msg), ready in zip(plot_jobs, has_inputs):
+        plot_path = next(rendered) if ready else None
+        if plot_path:
+            print(f"  wrote {plot_path}")
+        elif skipped_msg:
+            print(f"  {skipped_msg}")
 
     summary_txt = _write_summary(outdir, runs, summaries)
     print(f"  wrote {summary_txt}")
@@ -2133,7 +2231,7 @@ def main() -> None:
     if args.outdir:
         outdir = Path(args.outdir)
     else:
-        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
         outdir = Path(__file__).resolve().parent / "reports" / stamp
 
     run_filter = [r.strip() for r in args.runs.split(",")] if args.runs else None
@@ -13,12 +13,15 @@ import argparse
 import json
 import os
 import random
+import signal
 import sqlite3
 import math
 from datetime import datetime, timezone
 from pathlib import Path
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Optional
 
 from eth_account import Account
@@ -39,6 +42,13 @@ def clamp(x: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, x))
 
 
+def _write_manifest(out_dir: Path, manifest: dict) -> None:
+    """Write manifest.json via a temp file + rename so readers never see a partial file."""
+    tmp = out_dir / "manifest.json.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2) + "\n")
+    os.replace(tmp, out_dir / "manifest.json")
+
+
 def _maybe_start_reward_controller(run_dir: Path) -> dict:
     """
     Start the reward controller if enabled and not already running.
@@ -64,12 +74,11 @@ def _maybe_start_reward_controller(run_dir: Path) -> dict:
         pids = subprocess.check_output(["pgrep", "-f", "reward_controller_amm_swaps.js"]).decode().strip().split()
     except Exception:
         pids = []
-    if pids:
-        for pid in pids:
-            try:
-                subprocess.check_call(["kill", pid])
-            except Exception:
-                continue
+    for pid in pids:
+        try:
+            os.kill(int(pid), signal.SIGTERM)
+        except (ValueError, OSError):
+            continue
 
     log_path = run_dir / "reward_controller.log"
     # Use run-scoped controller files so each simulation starts from a clean cursor.
@@ -187,6 +196,11 @@ def _load_agents_from_latest_run() -> "tuple[list[Agent], Optional[str]]":
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--num-days", type=int, default=None, help="Override SIM_NUM_DAYS for this run.")
+    parser.add_argument(
+        "--background-post-run",
+        action="store_true",
+        help="Run post_run + report in a detached background process instead of waiting for them.",
+    )
     args = parser.parse_args()
 
     cfg = load_config()
@@ -220,7 +234,6 @@ def main() -> None:
 
     agent_active: dict[int, bool] = {}
     balance_cache: dict[tuple[int, str], int] = {}
-    token_contract_cache: dict[str, object] = {}
     pending_agents: set[int] = set()
     agent_is_eligible: dict[int, bool] = {}
     agent_buy_count: dict[int, int] = {}
@@ -253,61 +266,94 @@ def main() -> None:
     def _log_safe(x: float) -> float:
         return math.log(max(x, 1e-12))
 
+    # Pool orientation is fixed for the run; resolve it once instead of per price read.
+    slot0_fn = chain.pool.functions.slot0
+    pool_t0 = cfg.pool_token0.lower()
+    pool_t1 = cfg.pool_token1.lower()
+    token_is_token0 = cfg.token.lower() == pool_t0 and cfg.weth.lower() == pool_t1
+    token_is_token1 = cfg.token.lower() == pool_t1 and cfg.weth.lower() == pool_t0
+
     def _spot_price_weth_per_token() -> Optional[float]:
+        if not (token_is_token0 or token_is_token1):
+            return None
         try:
-            slot0 = chain.pool.functions.slot0().call()
-            sqrt_price_x96 = int(slot0[0])
+            sqrt_price_x96 = int(slot0_fn().call()[0])
             price_token1_per_token0 = (sqrt_price_x96 * sqrt_price_x96) / (2**192)
         except Exception:
             return None
 
-        t0 = cfg.pool_token0.lower()
-        t1 = cfg.pool_token1.lower()
-        token = cfg.token.lower()
-        weth = cfg.weth.lower()
-
-        if token == t0 and weth == t1:
+        if token_is_token0:
             return float(price_token1_per_token0)
-        if token == t1 and weth == t0:
-            if price_token1_per_token0 == 0:
-                return None
-            return float(1.0 / price_token1_per_token0)
-        return None
+        if price_token1_per_token0 == 0:
+            return None
+        return float(1.0 / price_token1_per_token0)
 
-    def _pool_reserves() -> tuple[float, float]:
-        token_bal = chain.token.functions.balanceOf(chain.pool_addr).call()
-        weth = chain.w3.eth.contract(address=chain.weth_addr, abi=chain.erc20_abi)
-        weth_bal = weth.functions.balanceOf(chain.pool_addr).call()
-        return token_bal / 1e18, weth_bal / 1e18
+    # balanceOf(address) calldata is built by hand so the hot balance reads skip
+    # web3's Contract construction and ABI codec (one raw eth_call per read).
+    balance_of_selector = bytes(chain.w3.keccak(text="balanceOf(address)")[:4])
 
-    def _erc20_balance(addr: str, holder: str) -> float:
-        token = chain.w3.eth.contract(address=addr, abi=chain.erc20_abi)
-        return token.functions.balanceOf(holder).call() / 1e18
+    def _balance_of_calldata(holder: str) -> bytes:
+        return balance_of_selector + bytes(12) + bytes.fromhex(holder[2:])
 
     def _erc20_balance_wei(addr: str, holder: str) -> int:
-        token = chain.w3.eth.contract(address=addr, abi=chain.erc20_abi)
-        return int(token.functions.balanceOf(holder).call())
+        raw = chain.w3.eth.call({"to": addr, "data": "0x" + _balance_of_calldata(holder).hex()})
+        return int.from_bytes(raw, "big")
 
-    def _erc20_balance_wei_cached(addr: str, holder: str) -> int:
-        if not cfg.fast_mode:
-            return _erc20_balance_wei(addr, holder)
-        token = token_contract_cache.get(addr)
-        if token is None:
-            token = chain.w3.eth.contract(address=addr, abi=chain.erc20_abi)
-            token_contract_cache[addr] = token
-        return int(token.functions.balanceOf(holder).call())
+    def _pool_reserves() -> tuple[float, float]:
+        token_bal = _erc20_balance_wei(chain.token_addr, chain.pool_addr)
+        weth_bal = _erc20_balance_wei(chain.weth_addr, chain.pool_addr)
+        return token_bal / 1e18, weth_bal / 1e18
+
+    balance_batch_size = max(1, int(os.getenv("SIM_BALANCE_BATCH_SIZE", "400")))
+
+    def _erc20_balances_wei(addr: str, holders: list[str]) -> list[int]:
+        """
+        Fresh balanceOf for many holders: one Multicall3 eth_call per batch when the
+        node has it, otherwise (or for any failed sub-call) one eth_call per holder.
+        """
+        if not holders:
+            return []
+        if not chain.multicall_available():
+            return [_erc20_balance_wei(addr, h) for h in holders]
+        out: list[int] = []
+        for i in range(0, len(holders), balance_batch_size):
+            batch = holders[i:i + balance_batch_size]
+            calls = [(addr, _balance_of_calldata(h)) for h in batch]
+            for h, ret in zip(batch, chain.multicall(calls)):
+                out.append(int.from_bytes(ret, "big") if ret else _erc20_balance_wei(addr, h))
+        return out
+
+    def _get_balances_wei(agent_list: list[Agent], token_addr: str) -> list[int]:
+        """Batched _get_balance_wei: cache hits are served locally, the rest in one multicall."""
+        out: list[int] = [0] * len(agent_list)
+        fetch: list[int] = []
+        for i, ag in enumerate(agent_list):
+            cached = None
+            if cfg.fast_mode and ag.agent_id not in pending_agents:
+                cached = balance_cache.get((ag.agent_id, token_addr))
+            if cached is None:
+                fetch.append(i)
+            else:
+                out[i] = cached
+        fetched = _erc20_balances_wei(token_addr, [agent_list[i].address for i in fetch])
+        for i, bal in zip(fetch, fetched):
+            ag = agent_list[i]
+            out[i] = bal
+            if cfg.fast_mode and ag.agent_id not in pending_agents:
+                balance_cache[(ag.agent_id, token_addr)] = bal
+        return out
 
     def _get_balance_wei(a: Agent, token_addr: str) -> int:
         if not cfg.fast_mode:
             return _erc20_balance_wei(token_addr, a.address)
         # Avoid stale cache for agents with pending txs in fast mode.
         if a.agent_id in pending_agents:
-            return _erc20_balance_wei_cached(token_addr, a.address)
+            return _erc20_balance_wei(token_addr, a.address)
         key = (a.agent_id, token_addr)
         cached = balance_cache.get(key)
         if cached is not None:
             return cached
-        bal = _erc20_balance_wei_cached(token_addr, a.address)
+        bal = _erc20_balance_wei(token_addr, a.address)
         balance_cache[key] = bal
         return bal
 
@@ -318,21 +364,21 @@ def main() -> None:
         weth_reserve: float,
         fee_pct: float,
     ) -> Optional[float]:
+        """
+        Fractional price impact of one constant-product swap (inverse of
+        _max_amount_for_slippage): post/pre price is (1 + delta_eff / reserve_in)^2
+        for a BUY and its reciprocal for a SELL.
+        """
         if amount_in <= 0 or token_reserve <= 0 or weth_reserve <= 0:
             return None
-        pre_price = weth_reserve / token_reserve
-        k = token_reserve * weth_reserve
         amt_eff = amount_in * (1.0 - fee_pct)
         if is_buy:
-            new_weth = weth_reserve + amt_eff
-            new_token = k / new_weth
-        else:
-            new_token = token_reserve + amt_eff
-            new_weth = k / new_token
-        post_price = new_weth / new_token if new_token > 0 else None
-        if post_price is None or pre_price <= 0:
+            ratio = 1.0 + amt_eff / weth_reserve
+            return abs(ratio * ratio - 1.0)
+        ratio = 1.0 + amt_eff / token_reserve
+        if ratio == 0.0:
             return None
-        return abs(post_price - pre_price) / pre_price
+        return abs(1.0 - 1.0 / (ratio * ratio))
 
     def _max_amount_for_slippage(
         is_buy: bool,
@@ -422,24 +468,26 @@ def main() -> None:
         agent_buy_count[a.agent_id] = 0
         agent_threshold_hit[a.agent_id] = False
 
-    def _update_threshold_flag_from_holdings(a: Agent) -> None:
+    def _update_threshold_flag_from_holdings(a: Agent, token_balance_wei: Optional[int] = None) -> None:
         """
         Threshold basis is held token balance (not cumulative bought).
         One-way latch: once threshold is hit, keep post-threshold state for the run.
+        token_balance_wei may be passed in when the caller already read it in a batch.
         """
         if threshold_tokens <= 0.0:
             agent_threshold_hit[a.agent_id] = False
             return
         if agent_threshold_hit.get(a.agent_id, False):
             return
-        token_balance_wei = _erc20_balance_wei(chain.token_addr, a.address)
-        token_balance = token_balance_wei / float(10**18)
+        if token_balance_wei is None:
+            token_balance_wei = _erc20_balance_wei(chain.token_addr, a.address)
+        token_balance = token_balance_wei / 1e18
         if token_balance >= threshold_tokens:
             agent_threshold_hit[a.agent_id] = True
 
     def _create_agent(agent_id: int) -> Agent:
         acct = Account.create()
-        return Agent(agent_id=agent_id, address=acct.address, private_key=acct.key.hex(), agent_type="retail")
+        return Agent(agent_id=agent_id, address=acct.address, private_key=acct.key.hex(), agent_type="retail", signer=acct)
 
     def _init_agent_state(a: Agent) -> None:
         agent_active[a.agent_id] = True
@@ -454,27 +502,49 @@ def main() -> None:
         eth_amount = cfg.agent_start_eth if start_eth is None else start_eth
         weth_amount = cfg.agent_start_weth if start_weth is None else start_weth
         token_amount = cfg.agent_start_token if start_token is None else start_token
-        # Fund ETH
-        txh = chain.fund_eth(a.address, eth_amount)
-        chain.wait_receipt(txh)
+        # Fund ETH + seed TOKEN (for SELL trades); both come from the admin.
+        for txh in chain.fund_agents([a.address], eth_amount, token_amount):
+            chain.wait_receipt(txh)
+
+        _setup_agent_wallet(a, weth_amount)
 
+        # Persist agent info
+        db.upsert_agent(run_id, a.agent_id, a.address, a.private_key, a.executor, a.agent_type)
+
+    def _setup_agent_wallet(a: Agent, weth_amount: float) -> None:
+        """Agent-signed init steps (only touch the agent's own nonce)."""
         # Wrap ETH to WETH (for BUY trades)
-        agent_acct = Account.from_key(a.private_key)
+        agent_acct = chain.agent_account(a)
         txh = chain.wrap_eth_to_weth(agent_acct, weth_amount)
         chain.wait_receipt(txh)
 
-        # Seed TOKEN (for SELL trades)
-        txh = chain.transfer_token(a.address, token_amount)
-        chain.wait_receipt(txh)
-
         # Deploy payer-bound executor
         exec_addr = chain.deploy_executor_for_agent(a)
         a.executor = exec_addr
         if cfg.fast_mode:
             chain.preapprove_agent(a, exec_addr)
 
-        # Persist agent info
-        db.upsert_agent(run_id, a.agent_id, a.address, a.private_key, a.executor, a.agent_type)
+    def _init_agents_onchain(agent_list: list[Agent]) -> None:
+        """
+        _init_agent_onchain for the initial population.
+
+        Admin funding txs are sent back to back from this thread as one batch (one
+        admin nonce block), then their receipts and each agent's own
+        wrap/deploy/approve steps run on a thread pool, since those only wait on RPC.
+        """
+        if not agent_list:
+            return
+        funding = chain.fund_agents([a.address for a in agent_list], cfg.agent_start_eth, cfg.agent_start_token)
+        total_agents = len(agent_list)
+        workers = max(1, min(int(os.getenv("SIM_AGENT_INIT_WORKERS", "16")), total_agents))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(chain.wait_receipt, funding))
+            setup = pool.map(partial(_setup_agent_wallet, weth_amount=cfg.agent_start_weth), agent_list)
+            for idx, _ in enumerate(setup, start=1):
+                if idx == 1 or idx == total_agents or idx % 5 == 0:
+                    print(f"  init agent {idx}/{total_agents} done")
+        for a in agent_list:
+            db.upsert_agent(run_id, a.agent_id, a.address, a.private_key, a.executor, a.agent_type)
 
     # ----------------------------
     # Create initial agents (or continue from latest run)
@@ -506,11 +576,7 @@ def main() -> None:
     # ----------------------------
     if prior_run_id is None:
         print(f"Initializing {len(agents)} agents...")
-        total_agents = len(agents)
-        for idx, a in enumerate(agents, start=1):
-            if idx == 1 or idx == total_agents or idx % 5 == 0:
-                print(f"  init agent {idx}/{total_agents} ...")
-            _init_agent_onchain(a)
+        _init_agents_onchain(agents)
     else:
         print(f"Reusing {len(agents)} agents from prior run; no re-funding or re-deploy.")
         for a in agents:
@@ -672,7 +738,7 @@ def main() -> None:
         "reward_controller": controller_meta,
         "continued_from_run_id": prior_run_id,
     }
-    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2) + "\n")
+    _write_manifest(out_dir, manifest)
 
     fast_no_receipts = (
         cfg.fast_mode and os.getenv("SIM_FAST_NO_RECEIPTS", "true").strip().lower() in {"1", "true", "yes", "y"}
@@ -696,7 +762,7 @@ def main() -> None:
         # Pre-wrap a large amount of WETH for aggregated BUYs.
         wrap_weth = float(os.getenv("SIM_FAST_AGG_WETH", "100000"))
         try:
-            txh = chain.wrap_eth_to_weth(Account.from_key(admin_agent.private_key), wrap_weth)
+            txh = chain.wrap_eth_to_weth(chain.agent_account(admin_agent), wrap_weth)
             chain.wait_receipt(txh)
         except Exception:
             pass
@@ -770,7 +836,33 @@ def main() -> None:
             return 1
         return 2
 
-    with jsonl_path.open("a") as f:
+    receipt_workers = max(1, int(os.getenv("SIM_RECEIPT_WORKERS", "16")))
+
+    def _wait_receipt_or_error(tx_hash: str) -> object:
+        try:
+            return chain.wait_receipt(tx_hash)
+        except Exception as e:
+            return e
+
+    def _send_and_wait(order: tuple[Agent, str, str, str, int]) -> tuple[Optional[str], object]:
+        a, _side, token_in, _token_out, amount_in_wei = order
+        try:
+            tx_hash = chain.execute_swap_exact_in(
+                a,
+                a.executor,
+                token_in_addr=token_in,
+                amount_in_wei=amount_in_wei,
+                pool_token0=cfg.pool_token0,
+                pool_token1=cfg.pool_token1,
+            )
+        except Exception as e:
+            return None, e
+        return tx_hash, _wait_receipt_or_error(tx_hash)
+
+    # Trade/factor rows are queued in memory during the loop and written by db.flush()
+    # at each day end, so no write lock is held across RPC waits; anything still
+    # queued (e.g. if a day raises) is written when the block exits.
+    with jsonl_path.open("a") as f, ThreadPoolExecutor(max_workers=receipt_workers) as receipt_pool, db.deferred_writes():
         pending_receipts: list[tuple[str, int, int, str, str, str, str]] = []
         poll_limit = int(os.getenv("SIM_FAST_POLL_LIMIT", "200"))
         fast_poll_every = int(os.getenv("SIM_FAST_POLL_EVERY_TICKS", "5" if fast_no_receipts else "1"))
@@ -878,9 +970,17 @@ def main() -> None:
             # Participant lifecycle (daily entry/churn).
             active_before_lifecycle = sum(1 for a in agents if agent_active.get(a.agent_id, True))
             # Refresh threshold flags daily using current held TOKEN balance.
-            for a in agents:
-                if agent_active.get(a.agent_id, True):
-                    _update_threshold_flag_from_holdings(a)
+            # Unlatched agents' balances are read in one batched multicall.
+            refresh_agents = [a for a in agents if agent_active.get(a.agent_id, True)]
+            unlatched = [] if threshold_tokens <= 0.0 else [
+                a for a in refresh_agents if not agent_threshold_hit.get(a.agent_id, False)
+            ]
+            held_wei = dict(zip(
+                (a.agent_id for a in unlatched),
+                _erc20_balances_wei(chain.token_addr, [a.address for a in unlatched]),
+            ))
+            for a in refresh_agents:
+                _update_threshold_flag_from_holdings(a, held_wei.get(a.agent_id))
             active_ratio = active_before_lifecycle / max(1.0, float(cfg.max_agents))
             churn_prob = clamp(
                 cfg.churn_prob_base
@@ -974,6 +1074,7 @@ def main() -> None:
                         cached_price_tick = _tick
 
                 tick_intents: list[tuple[int, str, int, str, str]] = []
+                tick_orders: list[tuple[Agent, str, str, str, int]] = []
                 tick_buy_total = 0
                 tick_sell_total = 0
                 if cfg.fast_mode:
@@ -1037,12 +1138,8 @@ def main() -> None:
 
                 def _eligible_agents_for_side(side_name: str) -> list[tuple[Agent, int]]:
                     token_addr = chain.weth_addr if side_name == "BUY" else chain.token_addr
-                    out: list[tuple[Agent, int]] = []
-                    for ag in active_agents:
-                        bal_wei = _get_balance_wei(ag, token_addr)
-                        if bal_wei > 0:
-                            out.append((ag, bal_wei))
-                    return out
+                    balances = _get_balances_wei(active_agents, token_addr)
+                    return [(ag, bal_wei) for ag, bal_wei in zip(active_agents, balances) if bal_wei > 0]
 
                 candidates = _eligible_agents_for_side(side)
                 if not candidates:
@@ -1105,10 +1202,12 @@ def main() -> None:
                     side_name: str,
                 ) -> list[tuple[Agent, int]]:
                     pool = list(items)
+                    # Weights depend only on per-agent flags, so compute them once and pop
+                    # them alongside the pool instead of rebuilding the list every pick.
+                    weights = [max(0.0, _agent_order_weight(ag, side_name)) for ag, _ in pool]
                     chosen: list[tuple[Agent, int]] = []
                     target = min(k, len(pool))
                     for _ in range(target):
-                        weights = [max(0.0, _agent_order_weight(ag, side_name)) for ag, _ in pool]
                         total = sum(weights)
                         if total <= 0:
                             chosen.extend(random.sample(pool, target - len(chosen)))
@@ -1122,6 +1221,7 @@ def main() -> None:
                                 pick_i = i
                                 break
                         chosen.append(pool.pop(pick_i))
+                        weights.pop(pick_i)
                     return chosen
 
                 selected_agents = _weighted_sample_without_replacement(candidates, order_count, side)
@@ -1140,7 +1240,7 @@ def main() -> None:
                     amount_in_wei = min(target_wei, cap_wei, spendable_wei)
                     if amount_in_wei <= 0:
                         continue
-                    clamped_amount = amount_in_wei / float(10**18)
+                    clamped_amount = amount_in_wei / 1e18
                     cap_hit = target_wei > cap_wei
 
                     slippage = _estimated_slippage(
@@ -1166,6 +1266,8 @@ def main() -> None:
                             tick_buy_total += amount_in_wei
                         else:
                             tick_sell_total += amount_in_wei
+                    elif not cfg.fast_mode:
+                        tick_orders.append((a, side, token_in, token_out, amount_in_wei))
                     else:
                         try:
                             tx_hash = chain.execute_swap_exact_in(
@@ -1178,18 +1280,8 @@ def main() -> None:
                             )
                             db.insert_trade(run_id, day, a.agent_id, side, str(amount_in_wei),
                                             token_in, token_out, tx_hash, "SENT", None, None, None)
-                            if cfg.fast_mode:
-                                pending_receipts.append((tx_hash, day, a.agent_id, side, token_in, token_out, str(amount_in_wei)))
-                                pending_agents.add(a.agent_id)
-                            else:
-                                rcpt = chain.wait_receipt(tx_hash)
-                                if rcpt.status == 1:
-                                    db.insert_trade(run_id, day, a.agent_id, side, str(amount_in_wei),
-                                                    token_in, token_out, tx_hash, "MINED", None, rcpt.blockNumber, rcpt.gasUsed)
-                                else:
-                                    db.insert_trade(run_id, day, a.agent_id, side, str(amount_in_wei),
-                                                    token_in, token_out, tx_hash, "REVERT", "receipt.status=0", rcpt.blockNumber, rcpt.gasUsed)
-
+                            pending_receipts.append((tx_hash, day, a.agent_id, side, token_in, token_out, str(amount_in_wei)))
+                            pending_agents.add(a.agent_id)
                         except Exception as e:
                             db.insert_trade(run_id, day, a.agent_id, side, str(amount_in_wei),
                                             token_in, token_out, None, "REVERT", str(e), None, None)
@@ -1213,20 +1305,37 @@ def main() -> None:
                         "token_out": token_out,
                         "ts_utc": utc_now_iso(),
                     }) + "\n"
-                    if cfg.fast_mode:
-                        jsonl_buf.append(line)
-                    else:
-                        f.write(line)
-                        f.flush()
+                    jsonl_buf.append(line)
                     day_trades += 1
                     if side == "BUY":
                         agent_buy_count[a.agent_id] = int(agent_buy_count.get(a.agent_id, 0)) + 1
-                    # In non-fast mode receipts are synchronous; keep threshold status
-                    # aligned to actual held balance after each successful trade.
-                    if not cfg.fast_mode:
-                        _update_threshold_flag_from_holdings(a)
                     remaining_target = max(0.0, remaining_target - clamped_amount)
 
+                if tick_orders:
+                    # Non-fast mode: a tick's orders come from distinct agents (sampled
+                    # without replacement), so each agent's approve/sign/send and receipt
+                    # wait runs on the pool; DB rows are still written here, in order.
+                    tick_results = receipt_pool.map(_send_and_wait, tick_orders)
+                    for (a, side_sent, token_in, token_out, amount_in_wei), (tx_hash, rcpt) in zip(tick_orders, tick_results):
+                        if tx_hash is None:
+                            db.insert_trade(run_id, day, a.agent_id, side_sent, str(amount_in_wei),
+                                            token_in, token_out, None, "REVERT", str(rcpt), None, None)
+                            _update_threshold_flag_from_holdings(a)
+                            continue
+                        db.insert_trade(run_id, day, a.agent_id, side_sent, str(amount_in_wei),
+                                        token_in, token_out, tx_hash, "SENT", None, None, None)
+                        if isinstance(rcpt, Exception):
+                            db.insert_trade(run_id, day, a.agent_id, side_sent, str(amount_in_wei),
+                                            token_in, token_out, None, "REVERT", str(rcpt), None, None)
+                        elif rcpt.status == 1:
+                            db.insert_trade(run_id, day, a.agent_id, side_sent, str(amount_in_wei),
+                                            token_in, token_out, tx_hash, "MINED", None, rcpt.blockNumber, rcpt.gasUsed)
+                        else:
+                            db.insert_trade(run_id, day, a.agent_id, side_sent, str(amount_in_wei),
+                                            token_in, token_out, tx_hash, "REVERT", "receipt.status=0", rcpt.blockNumber, rcpt.gasUsed)
+                        # Keep threshold status aligned to actual held balance once mined.
+                        _update_threshold_flag_from_holdings(a)
+
                 if fast_aggregate and tick_intents:
                     # Write agent-level intents without per-agent on-chain execution.
                     for agent_id, side, amount_in_wei, token_in, token_out in tick_intents:
@@ -1234,50 +1343,41 @@ def main() -> None:
                                         token_in, token_out, None, "AGG_INTENT", None, None, None)
 
                     if admin_agent and admin_executor:
-                        if tick_buy_total > 0:
+                        for agg_side, agg_total, agg_in, agg_out in (
+                            ("BUY", tick_buy_total, cfg.weth, cfg.token),
+                            ("SELL", tick_sell_total, cfg.token, cfg.weth),
+                        ):
+                            if agg_total <= 0:
+                                continue
                             try:
                                 tx_hash = chain.execute_swap_exact_in(
                                     admin_agent,
                                     admin_executor,
-                                    token_in_addr=cfg.weth,
-                                    amount_in_wei=tick_buy_total,
+                                    token_in_addr=agg_in,
+                                    amount_in_wei=agg_total,
                                     pool_token0=cfg.pool_token0,
                                     pool_token1=cfg.pool_token1,
                                 )
-                                db.insert_trade(run_id, day, -1, "BUY", str(tick_buy_total),
-                                                cfg.weth, cfg.token, tx_hash, "SENT", None, None, None)
+                                db.insert_trade(run_id, day, -1, agg_side, str(agg_total),
+                                                agg_in, agg_out, tx_hash, "SENT", None, None, None)
                                 if cfg.fast_mode:
-                                    pending_receipts.append((tx_hash, day, -1, "BUY", cfg.weth, cfg.token, str(tick_buy_total)))
+                                    pending_receipts.append((tx_hash, day, -1, agg_side, agg_in, agg_out, str(agg_total)))
                             except Exception as e:
-                                db.insert_trade(run_id, day, -1, "BUY", str(tick_buy_total),
-                                                cfg.weth, cfg.token, None, "REVERT", str(e), None, None)
-
-                        if tick_sell_total > 0:
-                            try:
-                                tx_hash = chain.execute_swap_exact_in(
-                                    admin_agent,
-                                    admin_executor,
-                                    token_in_addr=cfg.token,
-                                    amount_in_wei=tick_sell_total,
-                                    pool_token0=cfg.pool_token0,
-                                    pool_token1=cfg.pool_token1,
-                                )
-                                db.insert_trade(run_id, day, -1, "SELL", str(tick_sell_total),
-                                                cfg.token, cfg.weth, tx_hash, "SENT", None, None, None)
-                                if cfg.fast_mode:
-                                    pending_receipts.append((tx_hash, day, -1, "SELL", cfg.token, cfg.weth, str(tick_sell_total)))
-                            except Exception as e:
-                                db.insert_trade(run_id, day, -1, "SELL", str(tick_sell_total),
-                                                cfg.token, cfg.weth, None, "REVERT", str(e), None, None)
+                                db.insert_trade(run_id, day, -1, agg_side, str(agg_total),
+                                                agg_in, agg_out, None, "REVERT", str(e), None, None)
 
                 if cfg.fast_mode:
                     if (_tick + 1) % max(1, fast_poll_every) == 0:
                         _poll_pending_receipts(max_checks=poll_limit)
                     if (_tick + 1) % max(1, fast_jsonl_flush_ticks) == 0:
                         _flush_jsonl()
+                else:
+                    # trades.jsonl is a secondary log (SQLite is authoritative):
+                    # one write + flush per tick instead of per trade.
+                    _flush_jsonl()
 
+            _flush_jsonl()
             if cfg.fast_mode:
-                _flush_jsonl()
                 _poll_pending_receipts()
 
             spot_price = _spot_price_weth_per_token()
@@ -1301,6 +1401,8 @@ def main() -> None:
             db.insert_perceived_fair_value(run_id, day, avg_perceived_log)
             db.insert_trade_cap_daily(run_id, day, "BUY", cap_stats["BUY"]["trades"], cap_stats["BUY"]["caps"])
             db.insert_trade_cap_daily(run_id, day, "SELL", cap_stats["SELL"]["trades"], cap_stats["SELL"]["caps"])
+            # Commit the day's queued rows in one short transaction.
+            db.flush()
 
             active_count = sum(1 for a in agents if agent_active.get(a.agent_id, True))
             print(
@@ -1323,25 +1425,45 @@ def main() -> None:
 
     # Also append to manifest for human debugging.
     manifest["run_end_block"] = int(run_end_block)
-    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2) + "\n")
+    _write_manifest(out_dir, manifest)
 
     db.close()
     print(f"\nDone. Outputs written to: {out_dir}")
     print(f"Run block window: start={run_start_block} end={run_end_block}")
 
+    post_run_cmd = [sys.executable, "-m", "sim.post_run", str(db_path), "--run-id", run_id]
+    report_outdir = Path("sim/reports") / run_id
+    report_cmd = [sys.executable, "-m", "sim.report", "--outdir", str(report_outdir), "--runs", run_id]
+
+    if args.background_post_run:
+        # One detached child runs post_run then report, so a chained next run can
+        # start its setup while this run's analytics are still being computed.
+        # The chaining (report only if post_run succeeded) is done by a Python child
+        # rather than a shell so it works on any platform.
+        chained = (
+            "import subprocess, sys\n"
+            f"sys.exit(subprocess.call({post_run_cmd!r}) or subprocess.call({report_cmd!r}))"
+        )
+        log_path = out_dir / "post_run.log"
+        with log_path.open("a") as log_f:
+            proc = subprocess.Popen(
+                [sys.executable, "-c", chained],
+                stdout=log_f,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+        (out_dir / "post_run.pid").write_text(str(proc.pid) + "\n")
+        print(f"post_run + report started in background (pid={proc.pid}, log={log_path}).")
+        return
+
     # Kick off post_run analytics + warehouse append automatically.
     print("Running post_run (cohorts, swaps, prices, mints, wallet activity, warehouse append) ...")
-    subprocess.check_call(
-        [sys.executable, "-m", "sim.post_run", str(db_path), "--run-id", run_id]
-    )
+    subprocess.check_call(post_run_cmd)
     print("post_run complete.")
 
     # Generate report plots for this run.
-    report_outdir = Path("sim/reports") / run_id
     print(f"Running report (plots -> {report_outdir}) ...")
-    subprocess.check_call(
-        [sys.executable, "-m", "sim.report", "--outdir", str(report_outdir), "--runs", run_id]
-    )
+    subprocess.check_call(report_cmd)
     print("report complete.")
 
 
@@ -13,10 +13,9 @@ import sys
 from pathlib import Path
 
 
-def q(conn: sqlite3.Connection, sql: str, params: tuple = ()):
-    """Convenience query helper."""
-    cur = conn.execute(sql, params)
-    return cur.fetchall()
+def q(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+    """Convenience query helper; iterate the cursor (or fetchone()) to stream rows."""
+    return conn.execute(sql, params)
 
 
 def main():
@@ -30,10 +29,10 @@ def main():
     conn = sqlite3.connect(str(db_path))
 
     # Run metadata
-    run = q(conn, "SELECT run_id, network, token, pool, weth, created_at_utc FROM sim_runs LIMIT 1")
+    run = q(conn, "SELECT run_id, network, token, pool, weth, created_at_utc FROM sim_runs LIMIT 1").fetchone()
     if not run:
         raise SystemExit("No sim_runs row found. DB may be empty/corrupt.")
-    run_id, network, token, pool, weth, created_at = run[0]
+    run_id, network, token, pool, weth, created_at = run
 
     print("Run metadata")
     print(f"  run_id    : {run_id}")
@@ -44,13 +43,15 @@ def main():
     print(f"  weth      : {weth}")
     print("")
 
-    # Basic trade counts
-    total = q(conn, "SELECT COUNT(*) FROM trades")[0][0]
-    mined = q(conn, "SELECT COUNT(*) FROM trades WHERE status='MINED'")[0][0]
-    reverted = q(conn, "SELECT COUNT(*) FROM trades WHERE status='REVERT'")[0][0]
-
-    buys = q(conn, "SELECT COUNT(*) FROM trades WHERE side='BUY'")[0][0]
-    sells = q(conn, "SELECT COUNT(*) FROM trades WHERE side='SELL'")[0][0]
+    # Basic trade counts (one scan of trades for all five figures)
+    total, mined, reverted, buys, sells = q(conn, """
+        SELECT COUNT(*),
+               COUNT(CASE WHEN status='MINED' THEN 1 END),
+               COUNT(CASE WHEN status='REVERT' THEN 1 END),
+               COUNT(CASE WHEN side='BUY' THEN 1 END),
+               COUNT(CASE WHEN side='SELL' THEN 1 END)
+        FROM trades
+    """).fetchone()
 
     print("Trades summary")
     print(f"  total attempts : {total}")